@@ -0,0 +1,106 @@
+# ----------------------------------ATMOSPHERE----------------------------------
+# The 1976 US Standard Atmosphere: density, pressure, temperature and speed of sound
+# by altitude. The layer formulas (an exp() or a pow() and a search for the layer) are
+# evaluated once at import into evenly spaced tables, so a lookup during a flight is
+# one index and one linear interpolation. Above 86 km the last layer is carried on as
+# isothermal, and the tables end at TOP, above which there is no air at all.
+
+import math
+
+GAMMA = 1.4  # ratio of specific heats of air
+GASCONSTANT = 287.053  # unit: J/(kg·K)
+G0 = 9.80665  # unit: m/s²
+SEALEVELPRESSURE = 101325.0  # unit: Pa
+# base altitude (m), base temperature (K) and lapse rate (K/m) of each layer
+LAYERS = (
+    (0.0, 288.15, -0.0065),
+    (11000.0, 216.65, 0.0),
+    (20000.0, 216.65, 0.001),
+    (32000.0, 228.65, 0.0028),
+    (47000.0, 270.65, 0.0),
+    (51000.0, 270.65, -0.0028),
+    (71000.0, 214.65, -0.002),
+    (84852.0, 186.946, 0.0),
+)
+TABLESTEP = 50.0  # unit: m
+TOP = 150000.0  # unit: m
+
+
+def layerPressure(basePressure, baseTemperature, lapse, height):
+    if lapse == 0:
+        return basePressure * math.exp(-G0 * height / (GASCONSTANT * baseTemperature))
+    temperature = baseTemperature + lapse * height
+    return basePressure * (temperature / baseTemperature) ** (
+        -G0 / (GASCONSTANT * lapse)
+    )
+
+
+BASEPRESSURES = [SEALEVELPRESSURE]  # unit: Pa, at the base of each layer
+for (base, baseTemperature, lapse), (top, _, _) in zip(LAYERS, LAYERS[1:]):
+    BASEPRESSURES.append(
+        layerPressure(BASEPRESSURES[-1], baseTemperature, lapse, top - base)
+    )
+
+
+def standardAtmosphere(alt):
+    # (density, pressure, temperature, speed of sound) straight from the layer formulas
+    alt = max(alt, 0.0)
+    for index in range(len(LAYERS) - 1, -1, -1):
+        base, baseTemperature, lapse = LAYERS[index]
+        if alt >= base:
+            break
+    temperature = baseTemperature + lapse * (alt - base)
+    pressure = layerPressure(BASEPRESSURES[index], baseTemperature, lapse, alt - base)
+    density = pressure / (GASCONSTANT * temperature)
+    return (
+        density,
+        pressure,
+        temperature,
+        math.sqrt(GAMMA * GASCONSTANT * temperature),
+    )
+
+
+ALTITUDES = [index * TABLESTEP for index in range(round(TOP / TABLESTEP) + 1)]
+DENSITY, PRESSURE, TEMPERATURE, SPEEDOFSOUND = (
+    list(column) for column in zip(*map(standardAtmosphere, ALTITUDES))
+)
+DENSITY[-1] = PRESSURE[-1] = 0.0  # so the air fades out smoothly at the top
+LASTINDEX = len(ALTITUDES) - 1
+
+
+def interpolate(column, alt):
+    position = alt / TABLESTEP
+    if position <= 0:
+        return column[0]
+    index = int(position)
+    if index >= LASTINDEX:
+        return column[LASTINDEX]
+    return column[index] + (column[index + 1] - column[index]) * (position - index)
+
+
+def tableRow(alt):
+    # (row, fraction of the way to the next row) of alt, for lookups into several
+    # columns at the same altitude
+    position = alt / TABLESTEP
+    if position <= 0:
+        return 0, 0.0
+    if position >= LASTINDEX:
+        return LASTINDEX - 1, 1.0
+    index = int(position)
+    return index, position - index
+
+
+def density(alt):
+    return interpolate(DENSITY, alt)  # unit: kg/m³
+
+
+def pressure(alt):
+    return interpolate(PRESSURE, alt)  # unit: Pa
+
+
+def temperature(alt):
+    return interpolate(TEMPERATURE, alt)  # unit: K
+
+
+def speedOfSound(alt):
+    return interpolate(SPEEDOFSOUND, alt)  # unit: m/s
@@ -0,0 +1,67 @@
+# ----------------------------------AUTOPILOT----------------------------------
+# A flight profile the simulation can fly on its own in place of the rocket's built-in
+# pitch program: pitch rates that hold up to given altitudes, and a throttle schedule
+# interpolated between (time, throttle) knots. Profiles are plain JSON, so the ones
+# found by optimize.py can be saved and flown again with simulate.py --autopilot.
+
+import bisect, json
+
+from flight import PITCHSTART
+
+MINTHROTTLE = 0.7
+MAXTHROTTLE = 1.0
+
+
+class Autopilot:
+    def __init__(self, pitchProgram, throttleSchedule, info=None):
+        # pitchProgram: (altitude, rate) pairs, rate (degrees/s) holds below altitude (m)
+        # throttleSchedule: (time, throttle) knots, time in s
+        self.pitchProgram = sorted((float(a), float(r)) for a, r in pitchProgram)
+        self.throttleSchedule = sorted(
+            (float(t), float(v)) for t, v in throttleSchedule
+        )
+        self.throttleTimes = [t for t, _ in self.throttleSchedule]
+        self.info = info if info is not None else {}  # e.g. rocket, orbit, outcome
+
+    def pitchAltitudes(self):
+        return [altitude for altitude, _ in self.pitchProgram]
+
+    def pitchRate(self, t, alt, aoa):
+        if t <= PITCHSTART or aoa < 0.5:
+            return 0.0
+        for altitude, rate in self.pitchProgram:
+            if alt < altitude:
+                return rate
+        return 0.0
+
+    def throttle(self, t):
+        if not self.throttleSchedule:
+            return MAXTHROTTLE
+        index = bisect.bisect_right(self.throttleTimes, t)
+        if index == 0:
+            value = self.throttleSchedule[0][1]
+        elif index == len(self.throttleSchedule):
+            value = self.throttleSchedule[-1][1]
+        else:
+            (t0, v0), (t1, v1) = self.throttleSchedule[index - 1 : index + 1]
+            value = v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+        return min(max(value, MINTHROTTLE), MAXTHROTTLE)
+
+    def toDict(self):
+        return {
+            "info": self.info,
+            "pitchProgram": [list(segment) for segment in self.pitchProgram],
+            "throttleSchedule": [list(knot) for knot in self.throttleSchedule],
+        }
+
+    def save(self, path):
+        with open(path, "w") as file:
+            json.dump(self.toDict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            profile = json.load(file)
+        return cls(
+            profile["pitchProgram"], profile["throttleSchedule"], profile.get("info")
+        )
@@ -0,0 +1,96 @@
+# ----------------------------------ASSET BAKING----------------------------------
+# Packs the status images of every rocket in Rockets/ into one atlas file per rocket:
+# the scaled upright model and a copy rotated to every angle bucket, each cropped to
+# its visible pixels and stored as raw RGBA so the game can memory-map the file
+# instead of decoding PNGs. The JSON index next to it is keyed by status code and
+# angle bucket and records the size of its atlas, so an atlas and an index from two
+# different bakes are never used together. Run it again whenever the images change.
+# A baked rocket is drawn at the angle step of its atlas instead of the 0.5 degrees the
+# sprite cache rotates to: every model is stored once per bucket, so 0.5 degree buckets
+# would take four times the 2 degree default, which is already about 300 MB for the
+# rockets in Rockets/.
+
+import argparse, json, os, time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from sprites import MODELSCALE, sourceSignature, scaleModel, rotateModel
+
+ROCKETSPATH = os.path.join(os.path.abspath(os.getcwd()), "Rockets")
+ATLASPATH = os.path.join(os.path.abspath(os.getcwd()), ".cache", "atlas")
+BAKEANGLESTEP = 2.0  # unit: degrees
+BAKEMAXANGLE = 90.0  # unit: degrees, the model turns from vertical to horizontal
+
+
+def bakeRocket(rocketName, angleStep, maxAngle, outputPath):
+    path = os.path.join(ROCKETSPATH, rocketName)
+    index = {
+        "scale": MODELSCALE,
+        "angleStep": angleStep,
+        "source": sourceSignature(path),
+        "size": 0,  # unit: bytes of the atlas
+        "sprites": {},
+    }
+    offset = 0
+    with open(os.path.join(outputPath, rocketName + ".atlas.tmp"), "wb") as atlas:
+
+        def pack(surface, position=()):
+            nonlocal offset
+            data = pygame.image.tobytes(surface, "RGBA")
+            atlas.write(data)
+            entry = [offset, surface.get_width(), surface.get_height(), *position]
+            offset += len(data)
+            return entry
+
+        for fileName in sorted(os.listdir(path)):
+            name, extension = os.path.splitext(fileName)
+            if extension != ".png":
+                continue
+            model = scaleModel(
+                pygame.image.load(os.path.join(path, fileName)), MODELSCALE
+            )
+            status = name[len(rocketName) + 1 :]
+            angles = {}
+            for bucket in range(round(maxAngle / angleStep) + 1):
+                angles[str(bucket)] = pack(*rotateModel(model, bucket * angleStep))
+            index["sprites"][status] = {"model": pack(model), "angles": angles}
+
+    index["size"] = offset
+    with open(os.path.join(outputPath, rocketName + ".json.tmp"), "w") as file:
+        json.dump(index, file)
+    # both are written to temporary files first, so a half-written file is never picked
+    # up, and the index goes in last; until it does, the old index does not match the
+    # size of the new atlas and the rocket is drawn from its images
+    for extension in (".atlas", ".json"):
+        os.replace(
+            os.path.join(outputPath, rocketName + extension + ".tmp"),
+            os.path.join(outputPath, rocketName + extension),
+        )
+    return len(index["sprites"]), offset
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack the rocket images into pre-rotated sprite atlases."
+    )
+    parser.add_argument("rockets", nargs="*", help="rocket folders (default: all)")
+    parser.add_argument(
+        "--angle-step", type=float, default=BAKEANGLESTEP, help="degrees per bucket"
+    )
+    parser.add_argument("--output", default=ATLASPATH)
+    args = parser.parse_args()
+
+    pygame.init()
+    os.makedirs(args.output, exist_ok=True)
+    for rocketName in args.rockets or sorted(os.listdir(ROCKETSPATH)):
+        start = time.perf_counter()
+        count, size = bakeRocket(rocketName, args.angle_step, BAKEMAXANGLE, args.output)
+        print(
+            f"{rocketName}: {count} models, {size / 2**20:.1f} MB "
+            f"in {time.perf_counter() - start:.1f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+# ----------------------------------BATCH SIMULATION----------------------------------
+# Flies N variants of one rocket at once. The variants (thrust multiplier, pitch-rate
+# multiplier, payload mass) change how a flight moves but never when its engines cut
+# off, since burn times count down with simulated time alone, so every flight shares
+# one Staging, driven exactly as Flight.step() drives it, and its stage masses. What
+# differs between flights is a row of numbers in one 2D array: the state of motion,
+# the variant and what it still carries. A step is a few dozen NumPy operations over
+# the rows of the flights still being integrated; a flight that coasts on an
+# orbit.Orbit or has hit the ground is moved out of the array and no longer costs
+# anything, and its state is read off the orbit when the flights finish.
+
+import numpy as np
+
+from flight import (
+    DT,
+    LAUNCHCOMPLETEDELAY,
+    PITCHSTART,
+    ESCAPETOWERALTITUDE,
+    FAIRINGALTITUDE,
+)
+from atmosphere import (
+    DENSITY,
+    PRESSURE,
+    SPEEDOFSOUND,
+    SEALEVELPRESSURE,
+    TABLESTEP,
+    LASTINDEX,
+    TOP,
+)
+from orbit import Orbit, GM, EARTHRADIUS, EARTHROTATION
+from rocket import MACHSTEP, DRAGCOEFFICIENTS, LIFTSLOPE, setFlag
+from staging import Staging
+
+MAXFLIGHTTIME = 20000.0  # unit: s, run() gives up on a flight that lasts longer
+
+# the rows of BatchFlight.columns
+COLUMNS = (
+    "altitude",
+    "velocity",
+    "xVelocity",
+    "yVelocity",
+    "aoa",
+    "noseCos",
+    "noseSin",
+    "thrust",
+    "thrustMultiplier",
+    "pitchRate",
+    "carriedMass",  # payload, escape tower and fairing
+    "towerMass",
+    "fairingMass",
+)
+(
+    ALTITUDE,
+    VELOCITY,
+    XVELOCITY,
+    YVELOCITY,
+    AOA,
+    NOSECOS,
+    NOSESIN,
+    THRUST,
+    THRUSTMULTIPLIER,
+    PITCHRATE,
+    CARRIEDMASS,
+    TOWERMASS,
+    FAIRINGMASS,
+) = range(len(COLUMNS))
+
+
+def slopeTables(*columns):
+    # (values, change to the next row) of every row of the columns, so interpolating
+    # all of them is two lookups
+    values = np.array(columns)
+    return values, np.append(np.diff(values), np.zeros((len(columns), 1)), axis=1)
+
+
+# ambient pressure as a fraction of sea level, which an engine's thrust falls off
+# linearly with (all Engine.thrustTable holds), density, and the speed of one MACHSTEP
+ATMOSPHERETABLES = slopeTables(
+    np.array(PRESSURE) / SEALEVELPRESSURE, DENSITY, np.array(SPEEDOFSOUND) * MACHSTEP
+)
+DRAGTABLES = slopeTables(DRAGCOEFFICIENTS)
+
+
+def tablePosition(position, lastIndex):
+    # row and fraction of the way to the next row of every position, as in
+    # atmosphere.interpolate(); position is in rows, never negative, and is used up
+    np.minimum(position, lastIndex, out=position)
+    index = position.astype(np.intp)
+    np.minimum(index, lastIndex - 1, out=index)
+    position -= index
+    return index, position
+
+
+def lookup(tables, position):
+    values, slopes = tables
+    index, fraction = position
+    result = slopes.take(index, axis=1)
+    result *= fraction
+    result += values.take(index, axis=1)
+    return result
+
+
+class BatchFlight:
+    def __init__(
+        self,
+        rocket,
+        orbit="LEO",
+        count=1,
+        thrustMultiplier=1.0,
+        pitchRateMultiplier=1.0,
+        payloadMass=None,
+        dt=DT,
+    ):
+        self.rocket = rocket = rocket.instance()  # shared by every flight
+        self.rocket.orbit = orbit
+        self.orbit = orbit
+        self.count = count
+        self.dt = dt
+        boosters = [rocket.boosters] if rocket.boosters.eng1Count != 0 else []
+        self.staging = Staging(rocket.coreStages(), boosters)
+        self.staging.start(0.0)
+
+        self.columns = np.zeros((len(COLUMNS), count))
+        columns = self.columns
+        columns[AOA] = 90.0
+        columns[NOSESIN] = 1.0
+        columns[NOSECOS] = np.cos(np.radians(90.0))
+        columns[THRUSTMULTIPLIER] = thrustMultiplier
+        columns[PITCHRATE] = np.multiply(pitchRateMultiplier, rocket.pitchRate())
+        columns[TOWERMASS] = rocket.launchEscape.mass
+        columns[FAIRINGMASS] = rocket.fairing.mass
+        columns[CARRIEDMASS] = (
+            rocket.payload.mass if payloadMass is None else payloadMass
+        )
+        columns[CARRIEDMASS] += columns[TOWERMASS] + columns[FAIRINGMASS]
+        self.rows = np.arange(count)  # the flight of each column of columns
+        self.results = self.columns.copy()  # of the flights moved out of columns
+
+        self.t = 0.0
+        self.events = []  # (time, message), the same for every flight
+        self.launchCompleteTimer = 0.0
+        self.payloadDeployed = False
+        self.finished = np.zeros(count, dtype=bool)
+        self.coasting = np.zeros(count, dtype=bool)
+        self.coasts = [None] * count  # orbit.Orbit of each flight that burned out
+        self.jettisons = [
+            (ESCAPETOWERALTITUDE, TOWERMASS),
+            (FAIRINGALTITUDE, FAIRINGMASS),
+        ]  # the ones some flight still carries
+
+    def column(self, index):
+        # one number of every flight, wherever its row is
+        values = self.results[index].copy()
+        values[self.rows] = self.columns[index]
+        return values
+
+    altitude = property(lambda self: self.column(ALTITUDE))
+    velocity = property(lambda self: self.column(VELOCITY))
+    xVelocity = property(lambda self: self.column(XVELOCITY))
+    yVelocity = property(lambda self: self.column(YVELOCITY))
+    aoa = property(lambda self: self.column(AOA))
+    thrust = property(lambda self: self.column(THRUST))
+
+    def log(self, message):
+        self.events.append((self.t, message))
+
+    def engineThrust(self, engine):
+        # Engine.run() for every flight at once. Its thrust table is linear in the
+        # ambient pressure, so the thrust is returned as two numbers: the vacuum
+        # thrust and what a sea-level pressure takes off it (kN)
+        if not engine.fire:
+            engine.fire = True
+            setFlag(engine.watchers, True)
+        fraction = 1.0
+        if engine.profileTable is not None:
+            fraction = engine.profileFraction(engine.ratedBurnTime - engine.burnTime)
+        engine.burnTime -= self.dt
+        return engine.thrustV * fraction, (engine.thrustV - engine.thrustSL) * fraction
+
+    def ignition(self, stage):
+        # Stage.ignition() for every flight at once
+        vacuum = loss = 0.0
+        if stage.eng1.burnTime != -1:
+            engineVacuum, engineLoss = self.engineThrust(stage.eng1)
+            vacuum += engineVacuum * stage.eng1Count
+            loss += engineLoss * stage.eng1Count
+        if stage.eng2.burnTime != -1 and stage.eng2Count != 0:
+            engineVacuum, engineLoss = self.engineThrust(stage.eng2)
+            vacuum += engineVacuum * stage.eng2Count
+            loss += engineLoss * stage.eng2Count
+        return vacuum, loss
+
+    def burn(self, pressure):
+        # Staging.burn() with a thrust for every flight
+        staging, dt = self.staging, self.dt
+        if staging.burnedOut():
+            return 0.0, 0.0
+        stage = staging.stages[staging.current]
+        vacuum, loss = self.ignition(stage)
+        massFlow = stage.burn(dt)
+        if staging.current == 0:
+            for booster in staging.boosters:
+                if booster.fireStage:
+                    boosterVacuum, boosterLoss = self.ignition(booster)
+                    vacuum += boosterVacuum
+                    loss += boosterLoss
+                    massFlow += booster.burn(dt)
+        thrust = pressure * -loss
+        thrust += vacuum
+        thrust *= self.columns[THRUSTMULTIPLIER]
+        if staging.hotStage is not None:
+            vacuum, loss = self.ignition(staging.hotStage)
+            thrust += vacuum - loss * pressure
+            massFlow += staging.hotStage.burn(dt)
+        return thrust, massFlow
+
+    def jettison(self, altitude):
+        # the tower or fairing of every flight that has climbed past its altitude
+        highest = altitude.max(initial=-np.inf)
+        for jettison in list(self.jettisons):
+            jettisonAltitude, index = jettison
+            if highest < jettisonAltitude:
+                continue
+            dropped = altitude >= jettisonAltitude
+            self.columns[CARRIEDMASS] -= self.columns[index] * dropped
+            self.columns[index][dropped] = 0.0
+            if altitude.min() >= jettisonAltitude:
+                self.jettisons.remove(jettison)
+
+    def step(self):
+        dt = self.dt
+        rocket = self.rocket
+        stepStart = self.t
+        self.t += dt
+        columns = self.columns
+        altitude = columns[ALTITUDE]
+        # no air is left once every flight is above TOP
+        inAir = altitude.min(initial=TOP) < TOP
+        pressure = 0.0
+        if inAir:
+            position = tablePosition(altitude * (1 / TABLESTEP), LASTINDEX)
+            pressure, density, machSpeed = lookup(ATMOSPHERETABLES, position)
+
+        # Staging, as in Flight.step():
+        self.staging.separate(self.t, self.log)
+        self.jettison(altitude)
+        thrust, massFlow = self.burn(pressure)
+        self.staging.update(self.t, self.log)
+        columns[THRUST] = thrust  # unit: kN
+
+        # Deploying payload:
+        if self.payloadDeployed:
+            self.launchCompleteTimer += dt
+        if self.staging.burnedOut() and not self.payloadDeployed:
+            self.log(f"{rocket.payload.name} deployed")
+            self.payloadDeployed = True
+        finishing = self.launchCompleteTimer >= LAUNCHCOMPLETEDELAY - 1e-9
+
+        # Semi-implicit Euler step, matching integrators.Euler:
+        velocity, xVelocity, yVelocity = columns[VELOCITY : YVELOCITY + 1]
+        noseCos, noseSin = columns[NOSECOS], columns[NOSESIN]
+        stageMass = (
+            rocket.boosters.mass
+            + rocket.firstStage.mass
+            + rocket.secondStage.mass
+            + rocket.thirdStage.mass
+        )
+        # mass at the start of the step
+        mass = columns[CARRIEDMASS] + (stageMass + massFlow * dt)
+        thrust = thrust * 1000.0
+        thrust /= mass
+        ax = noseCos * thrust
+        ay = noseSin * thrust
+        # gravity and the centrifugal term, as Rocket.Fg() and Rocket.Fc() per kg
+        radius = altitude + EARTHRADIUS
+        tangential = velocity + EARTHROTATION
+        tangential *= tangential
+        tangential -= GM / radius
+        tangential /= radius
+        ay += tangential
+        if rocket.referenceArea != 0 and inAir:
+            # drag and lift from the same tables as Rocket.aerodynamicForces(), with
+            # the direction of flight taken straight from the velocity components:
+            # per unit of speed, drag pulls back along (xVelocity, yVelocity) and
+            # lift pushes across it, in proportion to sin·cos of the angle of attack
+            airspeed = xVelocity * xVelocity
+            airspeed += yVelocity * yVelocity
+            np.sqrt(airspeed, out=airspeed)
+            force = density * (0.5 * rocket.referenceArea)
+            force /= mass  # q·A per m²/s² of airspeed, per kg
+            mach = airspeed / machSpeed  # unit: MACHSTEP
+            position = tablePosition(mach, len(DRAGCOEFFICIENTS) - 1)
+            (drag,) = lookup(DRAGTABLES, position)
+            drag *= airspeed
+            drag *= force
+            along = noseCos * xVelocity
+            along += noseSin * yVelocity
+            across = noseSin * xVelocity
+            across -= noseCos * yVelocity
+            lift = along * across
+            lift *= force * LIFTSLOPE
+            lift /= np.maximum(airspeed, 1e-300)  # standing still: no lift
+            ax -= drag * xVelocity + lift * yVelocity
+            ay -= drag * yVelocity - lift * xVelocity
+        aNet = ax * ax
+        aNet += ay * ay
+        np.sqrt(aNet, out=aNet)
+        turn = self.pitchTurn(stepStart)
+
+        velocity += aNet * dt
+        yVelocity += ay * dt
+        xVelocity += ax * dt
+        altitude += yVelocity * dt
+        if turn is not None:
+            self.turn(turn)
+
+        if self.staging.burnedOut() and altitude.max(initial=0.0) >= TOP:
+            self.startCoasts(altitude >= TOP)
+        if self.columns[ALTITUDE].min(initial=0.0) < 0:
+            # on the ground, where Flight stops integrating
+            self.drop(self.columns[ALTITUDE] < 0)
+        if finishing:
+            self.finish()
+
+    def pitchTurn(self, stepStart):
+        # how far Rocket.pitchProgramRate() turns the nose of every flight this step
+        # (degrees), or None while no flight pitches
+        if stepStart <= PITCHSTART:
+            return None
+        steepEnd, shallowEnd = self.rocket.pitchProgramAltitudes()
+        altitude, aoa = self.columns[ALTITUDE], self.columns[AOA]
+        rate = (altitude < steepEnd) * 2.0
+        rate += (altitude > steepEnd) & (altitude < shallowEnd)
+        rate *= aoa >= 0.5
+        if not rate.any():
+            return None
+        rate *= self.columns[PITCHRATE]
+        rate *= -self.dt
+        return rate
+
+    def turn(self, turn):
+        # turns the nose by rotating its direction through the small angle of the
+        # step, a few multiplications instead of cos() and sin() of the new angle;
+        # the series are exact to rounding for turns of up to a few degrees
+        columns = self.columns
+        noseCos, noseSin = columns[NOSECOS], columns[NOSESIN]
+        columns[AOA] += turn
+        turn = np.radians(turn)
+        square = turn * turn
+        turnCos = square * (-1 / 30) + 1.0
+        turnCos *= square * (-1 / 12)
+        turnCos += 1.0
+        turnCos *= square * -0.5
+        turnCos += 1.0
+        turnSin = square * (-1 / 20) + 1.0
+        turnSin *= square * (-1 / 6)
+        turnSin += 1.0
+        turnSin *= turn
+        rotated = noseCos * turnCos
+        rotated -= noseSin * turnSin
+        noseSin *= turnCos
+        noseSin += noseCos * turnSin
+        noseCos[:] = rotated
+
+    def drop(self, leaving):
+        # moves the flights of the leaving columns out of the array
+        rows = self.rows[leaving]
+        self.results[:, rows] = self.columns[:, leaving]
+        staying = ~leaving
+        self.columns = self.columns[:, staying]
+        self.rows = self.rows[staying]
+
+    def startCoasts(self, started):
+        altitude, yVelocity, velocity = self.columns[[ALTITUDE, YVELOCITY, VELOCITY]]
+        for index in np.flatnonzero(started):
+            self.coasts[self.rows[index]] = Orbit(
+                self.t,
+                altitude[index],
+                yVelocity[index],
+                velocity[index] + EARTHROTATION,
+            )
+        self.coasting[self.rows[started]] = True
+        self.drop(started)
+
+    def finish(self):
+        self.drop(np.ones(len(self.rows), dtype=bool))
+        self.finished[:] = True
+        for index in np.flatnonzero(self.coasting):
+            if self.results[ALTITUDE, index] >= 0:
+                altitude, yVelocity, tangentialVelocity = self.coasts[index].state(
+                    self.t
+                )
+                self.results[ALTITUDE, index] = altitude
+                self.results[YVELOCITY, index] = yVelocity
+                self.results[VELOCITY, index] = tangentialVelocity - EARTHROTATION
+                self.results[XVELOCITY, index] = self.results[VELOCITY, index]
+
+    def run(self, maxTime=MAXFLIGHTTIME):
+        while not self.finished.all():
+            if self.t > maxTime:
+                raise RuntimeError(
+                    f"{self.rocket.name} has not finished after {maxTime:g} s"
+                )
+            self.step()
+        return self
+
+    def evaluateResult(self, index):
+        return self.rocket.evaluateResult(
+            float(self.results[ALTITUDE, index]),
+            float(self.results[VELOCITY, index]),
+            self.coasts[index],
+        )
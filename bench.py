@@ -0,0 +1,243 @@
+# ----------------------------------BENCHMARKS----------------------------------
+# Measures how fast the simulator is, so a change can be checked for speed as well as
+# for results: physics steps per second of every library rocket through Flight.step()
+# (staging and findAcceleration()), the time a frame of each screen takes to draw and
+# present under the SDL dummy video driver, and the cold import time of the game and
+# of the headless flight code, each in a fresh interpreter. Every number is the best
+# of a few repeats, which is the least disturbed by other work on the machine. A flight
+# takes only a tenth of a second, so each repeat flies every rocket several times; even
+# so physics moves by 10% or so between runs on a busy machine, and its threshold
+# leaves room for that. The results are written as JSON and compared with a stored
+# baseline; the run fails when a metric is worse than the baseline by more than the
+# threshold of its group.
+
+import argparse, json, os, platform, subprocess, sys, time
+
+BENCHDIR = os.path.join(".cache", "bench")
+REPEATS = 5
+PHYSICSFLIGHTS = 5  # flights of each rocket per repeat
+FRAMES = 300  # per screen
+# slowdown allowed before a metric counts as a regression, as a fraction
+THRESHOLDS = {"physics": 0.20, "render": 0.25, "import": 0.25}
+UNITS = {"physics": "steps/s", "render": "us/frame", "import": "ms"}
+HIGHERISBETTER = ("physics",)
+IMPORTS = {"main": "import main", "flight": "import flight, library"}
+
+
+def physicsSteps(rocketKeys, repeats=REPEATS):
+    # rocket key -> steps/s; the rockets take turns, so a busy moment on the machine
+    # does not land on the same rocket in every repeat
+    from flight import Flight
+    from library import ROCKETS
+
+    best = dict.fromkeys(rocketKeys, 0.0)
+    for _ in range(repeats * PHYSICSFLIGHTS):
+        for key in rocketKeys:
+            flight = Flight(ROCKETS[key])
+            steps = 0
+            start = time.perf_counter()
+            while not flight.finished:
+                flight.step()
+                steps += 1
+            best[key] = max(best[key], steps / (time.perf_counter() - start))
+    return best
+
+
+def renderTimes(repeats=REPEATS, frames=FRAMES):
+    # unit: µs per frame, drawing the screen and presenting it
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main as game
+    from flight import Flight
+    from library import ROCKETS
+
+    flight = Flight(ROCKETS["Soyuz21a"])
+    rocket = flight.rocket
+    states = []
+    for _ in range(frames):
+        flight.step()
+        states.append((flight.interpolate(0.5), flight.acceleration, flight.thrust))
+    while not flight.finished:
+        flight.step()
+
+    def startScreen(state):
+        game.drawStartScreen()
+
+    def model(state):
+        (t, aoa, mass, altitude, velocity, xVelocity, yVelocity), _, _ = state
+        game.drawBlueBackground("lift-off")
+        game.displayModel(rocket, usedModels, aoa, rocket.status)
+
+    def data(state):
+        (t, aoa, mass, altitude, velocity, xVelocity, yVelocity), a, thrust = state
+        game.drawBlueBackground("lift-off")
+        game.printData(
+            t,
+            rocket,
+            aoa,
+            mass,
+            a[0],
+            a[2],
+            a[1],
+            velocity,
+            xVelocity,
+            yVelocity,
+            altitude,
+            thrust,
+            flight.thrustMultiplier,
+            rocket.status,
+        )
+
+    def eventLog(state):
+        game.drawBlueBackground("lift-off")
+        if not queueList:
+            for message in ("Booster separation", "Fairing jettisoned", "Stage two"):
+                game.addEventLog(queueList, queueTime, message)
+        game.printEventLog(queueList, queueTime, 1 / game.FPS)
+
+    def endScreen(state):
+        game.drawEndScreen(rocket, flight.altitude, flight.velocity, flight.coast)
+
+    results = {}
+    for name, draw in (
+        ("drawStartScreen", startScreen),
+        ("displayModel", model),
+        ("printData", data),
+        ("printEventLog", eventLog),
+        ("drawEndScreen", endScreen),
+    ):
+        best = float("inf")
+        for _ in range(repeats):
+            usedModels, queueList, queueTime = [], [], []
+            game.RENDERER.invalidate()
+            start = time.perf_counter()
+            for state in states:
+                draw(state)
+                game.RENDERER.present()
+            best = min(best, (time.perf_counter() - start) / len(states))
+        results[name] = best * 1e6
+    return results
+
+
+def importTime(statement, repeats=REPEATS):
+    # unit: ms, in a fresh interpreter each time
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    best = float("inf")
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=environment,
+        ).stdout
+        best = min(best, float(output.split()[-1]))
+    return best * 1000
+
+
+def benchmark(groups, repeats=REPEATS):
+    # "group.name" -> value, in the unit of its group
+    metrics = {}
+    if "physics" in groups:
+        from library import ROCKETS
+
+        for key, value in physicsSteps(list(ROCKETS), repeats).items():
+            metrics[f"physics.{key}"] = value
+    if "render" in groups:
+        for name, value in renderTimes(repeats).items():
+            metrics[f"render.{name}"] = value
+    if "import" in groups:
+        for name, statement in IMPORTS.items():
+            metrics[f"import.{name}"] = importTime(statement, repeats)
+    return metrics
+
+
+def compare(metrics, baseline, thresholds=THRESHOLDS):
+    # (metric, baseline, now, change, regressed); change > 0 is always a slowdown
+    rows = []
+    for metric, value in metrics.items():
+        if metric not in baseline:
+            continue
+        group = metric.split(".")[0]
+        old = baseline[metric]
+        if group in HIGHERISBETTER:
+            change = old / value - 1 if value > 0 else float("inf")
+        else:
+            change = value / old - 1 if old > 0 else 0.0
+        rows.append((metric, old, value, change, change > thresholds[group]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure physics and rendering speed against a baseline."
+    )
+    parser.add_argument(
+        "--groups",
+        nargs="+",
+        default=list(THRESHOLDS),
+        choices=list(THRESHOLDS),
+        help="what to measure",
+    )
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument(
+        "--out", default=os.path.join(BENCHDIR, "latest.json"), help="results file"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=os.path.join(BENCHDIR, "baseline.json"),
+        help="results to compare with",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the new baseline",
+    )
+    args = parser.parse_args()
+
+    metrics = benchmark(args.groups, args.repeats)
+    results = {
+        "info": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeats": args.repeats,
+        },
+        "units": UNITS,
+        "metrics": metrics,
+    }
+    for path in [args.out] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["metrics"]
+    except (OSError, ValueError, KeyError):
+        baseline = {}
+    rows = {row[0]: row for row in compare(metrics, baseline)}
+    print(f"{'metric':<26}{'value':>12}  {'unit':<9}{'baseline':>12}{'slower':>9}")
+    for metric, value in metrics.items():
+        line = f"{metric:<26}{value:>12.1f}  {UNITS[metric.split('.')[0]]:<9}"
+        if metric in rows:
+            _, old, _, change, regressed = rows[metric]
+            line += f"{old:>12.1f}{change * 100:>+8.1f}%"
+            line += "  REGRESSION" if regressed else ""
+        print(line)
+    regressions = [row for row in rows.values() if row[4]]
+    if not baseline:
+        print(f"\nno baseline at {args.baseline} (store one with --save-baseline)")
+    print(f"results saved to {args.out}")
+    if regressions:
+        print(f"{len(regressions)} metrics slower than the baseline allows")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# ----------------------------------FLIGHT SIMULATION----------------------------------
+# Runs the staging and integration logic of a launch without any window, so it can
+# be driven by the pygame loop in main.py or by the headless runner in simulate.py.
+# All rates are per second of simulated time and each step advances the flight by a
+# fixed dt, so the result does not depend on how often the flight is rendered. The
+# equations of motion are advanced by a pluggable integrator from integrators.py; with
+# an adaptive one, run() lets the step grow in quiet phases and cuts it short so that
+# ticks land on scheduled staging events. Once the last stage has burned out above the
+# atmosphere the flight coasts on an Orbit from orbit.py, which gives the exact
+# two-body state at any time. snapshot() packs everything that changes in flight into
+# one array of doubles and restore() puts it back, so a flight can be rewound, branched
+# or sent to another process as a few hundred bytes.
+
+import math, pickle
+from array import array
+
+from atmosphere import TOP
+from flightstate import StateLayout
+from integrators import Euler
+from orbit import Orbit, EARTHROTATION
+from staging import Staging
+
+DT = 1.0 / 20  # unit: s
+LAUNCHCOMPLETEDELAY = 15.0  # unit: s
+PITCHRATE = 2.0  # unit: degrees/s
+THROTTLERATE = 0.2  # unit: 1/s
+PITCHSTART = 7.0  # unit: s
+ESCAPETOWERALTITUDE = 69000  # unit: m
+FAIRINGALTITUDE = 130000  # unit: m
+NOCOAST = (math.nan,) * 4
+
+
+class Flight:
+    __slots__ = (
+        "rocket",
+        "dt",
+        "integrator",
+        "evaluations",
+        "staging",
+        "t",
+        "stepStart",
+        "altitude",
+        "thrust",
+        "velocity",
+        "yVelocity",
+        "xVelocity",
+        "acceleration",
+        "stepState",
+        "launchCompleteTimer",
+        "payloadDeployed",
+        "finished",
+        "thrustMultiplier",
+        "pitchRate",
+        "autopilot",
+        "massFlow",
+        "pitchInput",
+        "mass",
+        "events",
+        "coast",
+        "previous",
+        "recorder",
+        "layout",
+    )
+    STATEFIELDS = {
+        "t": float,
+        "stepStart": float,
+        "altitude": float,
+        "velocity": float,
+        "xVelocity": float,
+        "yVelocity": float,
+        "thrust": float,
+        "massFlow": float,
+        "mass": float,
+        "thrustMultiplier": float,
+        "pitchInput": float,
+        "launchCompleteTimer": float,
+        "payloadDeployed": bool,
+        "finished": bool,
+        "evaluations": int,
+    }
+
+    def __init__(
+        self,
+        rocket,
+        orbit="LEO",
+        dt=DT,
+        integrator=None,
+        thrustMultiplier=1.0,
+        pitchRateMultiplier=1.0,
+        recorder=None,
+        autopilot=None,
+    ):
+        # rocket itself is never flown, so it can be reused
+        self.rocket = rocket.instance()
+        self.dt = dt
+        self.integrator = integrator if integrator is not None else Euler()
+        self.evaluations = 0
+        self.rocket.orbit = orbit
+        rocket = self.rocket
+        boosters = [rocket.boosters] if rocket.boosters.eng1Count != 0 else []
+        self.staging = Staging(
+            rocket.coreStages(),
+            boosters,
+            [
+                (
+                    ESCAPETOWERALTITUDE,
+                    rocket.launchEscape,
+                    "Launch-escape tower jettisoned",
+                ),
+                (FAIRINGALTITUDE, rocket.fairing, "Fairing jettisoned"),
+            ],
+        )
+        self.staging.start(0.0)
+        self.t = self.stepStart = self.altitude = self.thrust = 0.0
+        self.velocity = self.yVelocity = self.xVelocity = 0.0
+        self.acceleration = (0.0, 0.0, 0.0)
+        self.stepState = None  # the state the current step starts from
+        self.launchCompleteTimer = 0.0
+        self.payloadDeployed = False
+        self.finished = False
+        self.thrustMultiplier = thrustMultiplier
+        self.pitchRate = rocket.pitchRate() * pitchRateMultiplier
+        self.autopilot = autopilot  # autopilot.Autopilot, flies instead of the rocket
+        self.massFlow = 0.0  # unit: kg/s
+        self.pitchInput = 0.0  # unit: degrees/s
+        self.mass = rocket.rocketMass()
+        self.events = []  # (time, message)
+        self.coast = None  # orbit.Orbit, once every stage has burned out
+        self.previous = self.renderState()
+        self.recorder = recorder  # telemetry.TelemetryRecorder
+        self.layout = StateLayout([self] + rocket.parts())
+        if recorder is not None:
+            recorder.record(self)
+
+    def __getstate__(self):
+        # the recorder stays with the original flight; the layout is rebuilt
+        return {
+            name: getattr(self, name)
+            for name in Flight.__slots__
+            if name not in ("recorder", "layout")
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.recorder = None
+        self.layout = StateLayout([self] + self.rocket.parts())
+
+    def clone(self):
+        # an independent flight with a rocket of its own, e.g. to try a what-if
+        return pickle.loads(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+
+    def snapshot(self):
+        values = self.layout.gather()
+        values += self.acceleration
+        values += self.previous
+        values.append(len(self.events))
+        values += NOCOAST if self.coast is None else self.coast.epoch
+        values.append(getattr(self.integrator, "h", 0.0))
+        values += self.staging.state()
+        return array("d", values)
+
+    def restore(self, snapshot):
+        # snapshot: what snapshot() returned for this flight
+        position = self.layout.scatter(snapshot)
+        self.acceleration = tuple(snapshot[position : position + 3])
+        self.previous = tuple(snapshot[position + 3 : position + 10])
+        del self.events[int(snapshot[position + 10]) :]
+        epoch = tuple(snapshot[position + 11 : position + 15])
+        if math.isnan(epoch[0]):
+            self.coast = None
+        elif self.coast is None or self.coast.epoch != epoch:
+            self.coast = Orbit(*epoch)
+        if self.integrator.adaptive:
+            self.integrator.h = snapshot[position + 15]
+        self.staging.restore(snapshot[position + 16 :])
+        self.stepState = None
+
+    def renderState(self):
+        return (
+            self.t,
+            self.rocket.AOA,
+            self.mass,
+            self.altitude,
+            self.velocity,
+            self.xVelocity,
+            self.yVelocity,
+        )
+
+    def interpolate(self, alpha):
+        # blend the last two physics states so rendering between steps stays smooth
+        return tuple(
+            previous + (current - previous) * alpha
+            for previous, current in zip(self.previous, self.renderState())
+        )
+
+    def log(self, message, newEvents):
+        newEvents.append(message)
+        self.events.append((self.t, message))
+        if self.recorder is not None:
+            self.recorder.event(self.t, message)
+
+    def derivative(self, elapsed, state):
+        velocity, yVelocity, xVelocity, altitude, mass, aoa = state
+        self.evaluations += 1
+        if state is self.stepState:
+            aNet, ay, ax = self.acceleration  # already worked out by step()
+        else:
+            aNet, ay, ax = self.rocket.findAcceleration(
+                self.staging.thrust(altitude, elapsed),
+                altitude,
+                mass,
+                velocity,
+                aoa,
+                xVelocity,
+                yVelocity,
+            )
+        if self.autopilot is not None:
+            program = self.autopilot.pitchRate(self.stepStart, altitude, aoa)
+        else:
+            program = self.rocket.pitchProgramRate(
+                self.stepStart, altitude, aoa, self.pitchRate
+            )
+        pitch = self.pitchInput - program
+        return aNet, ay, ax, yVelocity, -self.massFlow, pitch
+
+    def timeToNextStagingEvent(self):
+        times = [self.staging.timeToNextEvent(self.t)]
+        jettison = self.staging.nextJettisonAltitude()
+        if jettison is not None and self.yVelocity > 0 and self.altitude < jettison:
+            times.append((jettison + 1.0 - self.altitude) / self.yVelocity)
+        return min(times)
+
+    def timeToNextEvent(self):
+        if self.autopilot is not None:
+            pitchAltitudes = self.autopilot.pitchAltitudes()
+        else:
+            pitchAltitudes = self.rocket.pitchProgramAltitudes()
+        times = [self.timeToNextStagingEvent()]
+        if self.t < PITCHSTART:
+            times.append(PITCHSTART - self.t)
+        for threshold in pitchAltitudes:
+            if self.yVelocity > 0 and self.altitude < threshold:
+                times.append((threshold + 1.0 - self.altitude) / self.yVelocity)
+        if self.payloadDeployed:
+            times.append(LAUNCHCOMPLETEDELAY - self.launchCompleteTimer)
+        # overshoot by a hair so the threshold is actually crossed on this tick
+        return min(times) + 1e-9
+
+    def nextStep(self):
+        if not self.integrator.adaptive:
+            return self.dt
+        if self.coast is not None:
+            # the coast is exact for any step, so go straight to the next event
+            return max(self.timeToNextEvent(), 1e-6)
+        return max(min(self.integrator.h, self.timeToNextEvent()), 1e-6)
+
+    def step(
+        self,
+        pitchUp=False,
+        pitchDown=False,
+        throttleUp=False,
+        throttleDown=False,
+        dt=None,
+    ):
+        rocket = self.rocket
+        dt = self.dt if dt is None else dt
+        newEvents = []
+        self.previous = self.renderState()
+        self.stepStart = self.t
+        self.t += dt
+
+        if self.autopilot is not None:
+            self.thrustMultiplier = self.autopilot.throttle(self.stepStart)
+        self.pitchInput = 0.0
+        if (
+            pitchUp
+            and rocket.AOA <= 90.0
+            and self.t >= PITCHSTART
+            and not self.payloadDeployed
+        ):
+            self.pitchInput += PITCHRATE
+        if pitchDown and self.t >= PITCHSTART and not self.payloadDeployed:
+            self.pitchInput -= PITCHRATE
+        if throttleUp:
+            self.thrustMultiplier = min(self.thrustMultiplier + THROTTLERATE * dt, 1.0)
+        if throttleDown:
+            self.thrustMultiplier = max(self.thrustMultiplier - THROTTLERATE * dt, 0.7)
+
+        # Staging:
+        log = lambda message: self.log(message, newEvents)
+        self.staging.separate(self.t, log)
+        self.staging.jettison(self.altitude, log)
+        self.thrust, self.massFlow = self.staging.burn(
+            self.altitude, dt, self.thrustMultiplier
+        )
+        self.staging.update(self.t, log)
+
+        if self.payloadDeployed:
+            self.launchCompleteTimer += dt
+
+        # Deploying payload:
+        if self.staging.burnedOut() and not self.payloadDeployed:
+            self.log(f"{rocket.payload.name} deployed", newEvents)
+            self.payloadDeployed = True
+
+        if self.launchCompleteTimer >= LAUNCHCOMPLETEDELAY - 1e-9:
+            self.finished = True
+
+        self.mass = rocket.rocketMass()
+        state = (
+            self.velocity,
+            self.yVelocity,
+            self.xVelocity,
+            self.altitude,
+            self.mass + self.massFlow * dt,  # mass at the start of the step
+            rocket.AOA,
+        )
+        self.acceleration = rocket.findAcceleration(
+            self.thrust,
+            self.altitude,
+            state[4],
+            self.velocity,
+            rocket.AOA,
+            self.xVelocity,
+            self.yVelocity,
+        )
+        self.stepState = state
+        if self.altitude >= 0 and self.coast is not None:
+            self.altitude, self.yVelocity, tangentialVelocity = self.coast.state(self.t)
+            self.velocity = self.xVelocity = tangentialVelocity - EARTHROTATION
+        elif self.altitude >= 0:
+            (
+                self.velocity,
+                self.yVelocity,
+                self.xVelocity,
+                self.altitude,
+                _,
+                rocket.AOA,
+            ) = self.integrator.step(self.derivative, state, dt)
+        if self.coast is None and self.staging.burnedOut() and self.altitude >= TOP:
+            self.coast = Orbit(
+                self.t, self.altitude, self.yVelocity, self.velocity + EARTHROTATION
+            )
+
+        if self.recorder is not None:
+            self.recorder.record(self)
+        return newEvents
+
+    def run(self):
+        while not self.finished:
+            self.step(dt=self.nextStep())
+        return self.rocket.evaluateResult(self.altitude, self.velocity, self.coast)
@@ -0,0 +1,50 @@
+# ----------------------------------FLIGHT STATE----------------------------------
+# Everything about a flight that changes while it flies is a number in a slot of the
+# Flight, the Rocket or one of its components, named by the STATEFIELDS of each class
+# with the type it is kept in. A StateLayout lists those slots once, in a fixed order,
+# so the flight can be gathered into a single array of doubles by one attrgetter per
+# object and put back by one pass of setattr over the same list, whatever the flight
+# has been through in between. Rocket definitions, tables and the like never change in
+# flight and are not part of it.
+
+from operator import attrgetter
+
+CLASSLAYOUTS = {}  # class -> (names, types, getter), shared by every flight
+
+
+def classLayout(cls):
+    if cls not in CLASSLAYOUTS:
+        names = tuple(cls.STATEFIELDS)
+        getter = attrgetter(*names)
+        if len(names) == 1:
+            getter = lambda obj, get=getter: (get(obj),)
+        CLASSLAYOUTS[cls] = (names, tuple(cls.STATEFIELDS.values()), getter)
+    return CLASSLAYOUTS[cls]
+
+
+class StateLayout:
+    __slots__ = ("objects", "size")
+
+    def __init__(self, objects):
+        # objects: anything with STATEFIELDS; repeats and empty ones are skipped
+        self.objects = []
+        for obj in objects:
+            if obj.STATEFIELDS and not any(obj is other for other in self.objects):
+                self.objects.append(obj)
+        self.size = sum(len(obj.STATEFIELDS) for obj in self.objects)
+
+    def gather(self):
+        values = []
+        for obj in self.objects:
+            values += classLayout(type(obj))[2](obj)
+        return values
+
+    def scatter(self, values):
+        # returns how many values were used
+        position = 0
+        for obj in self.objects:
+            names, types, _ = classLayout(type(obj))
+            for name, kind in zip(names, types):
+                setattr(obj, name, kind(values[position]))
+                position += 1
+        return position
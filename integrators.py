@@ -0,0 +1,105 @@
+# ----------------------------------INTEGRATORS----------------------------------
+# Each integrator advances a state tuple by dt given derivative(elapsed, state), which
+# returns the time derivative of every component of the state elapsed seconds into the
+# step.
+
+
+class Euler:
+    adaptive = False
+
+    def step(self, derivative, state, dt):
+        # semi-implicit Euler: the last component is the position, which is advanced
+        # with the velocity that was just updated (this is what the game always used)
+        rates = derivative(0.0, state)
+        new = [value + rate * dt for value, rate in zip(state, rates)]
+        new[3] = state[3] + new[1] * dt
+        return tuple(new)
+
+
+class RK4:
+    adaptive = False
+
+    def step(self, derivative, state, dt):
+        k1 = derivative(0.0, state)
+        k2 = derivative(0.5 * dt, tuple(y + 0.5 * dt * k for y, k in zip(state, k1)))
+        k3 = derivative(0.5 * dt, tuple(y + 0.5 * dt * k for y, k in zip(state, k2)))
+        k4 = derivative(dt, tuple(y + dt * k for y, k in zip(state, k3)))
+        return tuple(
+            y + dt / 6.0 * (a + 2.0 * b + 2.0 * c + d)
+            for y, a, b, c, d in zip(state, k1, k2, k3, k4)
+        )
+
+
+# Dormand–Prince 5(4) coefficients
+C = (0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1)
+A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+)
+B5 = (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0)
+B4 = (
+    5179 / 57600,
+    0,
+    7571 / 16695,
+    393 / 640,
+    -92097 / 339200,
+    187 / 2100,
+    1 / 40,
+)
+E = tuple(b5 - b4 for b5, b4 in zip(B5, B4))
+
+
+class RK45:
+    adaptive = True
+
+    def __init__(self, rtol=1e-6, atol=1e-3, firstStep=0.05, maxStep=5.0):
+        self.rtol = rtol
+        self.atol = atol
+        self.h = firstStep  # unit: s, step suggested by the last error estimate
+        self.maxStep = maxStep  # unit: s
+
+    def step(self, derivative, state, dt):
+        # integrates over dt, splitting it into as many substeps as the error allows
+        elapsed = 0.0
+        k1 = derivative(0.0, state)
+        while elapsed < dt:
+            h = min(self.h, dt - elapsed)
+            k = [k1]
+            for c, row in zip(C[1:], A[1:]):
+                k.append(
+                    derivative(
+                        elapsed + c * h,
+                        tuple(
+                            y + h * sum(a * ki[i] for a, ki in zip(row, k))
+                            for i, y in enumerate(state)
+                        ),
+                    )
+                )
+            new = tuple(
+                y + h * sum(b * ki[i] for b, ki in zip(B5, k))
+                for i, y in enumerate(state)
+            )
+            k.append(derivative(elapsed + h, new))
+            error = 0.0
+            for i, (y, yNew) in enumerate(zip(state, new)):
+                scale = self.atol + self.rtol * max(abs(y), abs(yNew))
+                error += (h * sum(e * ki[i] for e, ki in zip(E, k)) / scale) ** 2
+            error = (error / len(state)) ** 0.5
+
+            factor = 5.0 if error == 0 else min(5.0, max(0.2, 0.9 * error**-0.2))
+            if error <= 1.0:
+                elapsed += h
+                state = new
+                k1 = k[-1]
+                if h == self.h or factor < 1.0:
+                    self.h = min(h * factor, self.maxStep)
+            else:
+                self.h = h * factor
+        return state
+
+
+INTEGRATORS = {"euler": Euler, "rk4": RK4, "rk45": RK45}
@@ -0,0 +1,285 @@
+# -----------------------------------ROCKET LIBRARY-----------------------------------
+# Rockets are defined in JSON files in Library/, one vehicle per file named after its
+# key, so Library/Soyuz21a.json is ROCKETS["Soyuz21a"]. Nothing is built at import:
+# the index of keys, names and select-screen images is kept in .cache/library and a
+# definition is only re-read for it when the file's size or modification time
+# changes. A rocket is built the first time it is asked for. Its definition is checked
+# and compiled into Engine, Stage and Rocket objects, which are pickled under the hash
+# of the file, so later runs load the compiled rocket without parsing or checking.
+#
+# A definition holds the rocket's "name", "diameter" (m) and optional select-screen
+# image in Assets/ ("button"); its "engines" by name, each with "burnTime" (s),
+# "thrustSL" and "thrustV" (kN) and an optional "thrustProfile" of [seconds burned,
+# fraction] knots; its "stages" ("boosters", "first", "second", "third"), each with
+# "emptyMass" and "grossMass" (kg), one or two [engine, count] pairs in "engines" and
+# an optional "hotSeparation"; the "payload" ({"name", "mass"}) and the "fairing" and
+# "launchEscape" masses (kg). Every stage gets engines of its own, so rockets built
+# from the same engine never share its burn. The rockets handed out are specs that
+# are never flown themselves: a Flight flies a Rocket.instance() of one, so any number
+# of launches, in turn or at once, start from the same untouched rocket.
+
+import hashlib, json, os, pickle
+from collections.abc import Mapping
+
+from rocket import Engine, Stage, Payload, LaunchEscapeTower, Fairing, Rocket
+
+LIBRARYPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Library")
+CACHEDIR = os.path.join(".cache", "library")
+COMPILEDVERSION = 2  # bump when the rocket classes change so old pickles are rebuilt
+# the slots of every pickled class are part of the cache key as well, so a slot that
+# is added or renamed misses the old pickles even if COMPILEDVERSION was not bumped
+SLOTS = ";".join(
+    f"{cls.__name__}:{','.join(cls.__slots__)}"
+    for cls in (Engine, Stage, Payload, LaunchEscapeTower, Fairing, Rocket)
+)
+STAGENAMES = ("boosters", "first", "second", "third")
+ROCKETFIELDS = (
+    "name",
+    "button",
+    "diameter",
+    "engines",
+    "stages",
+    "payload",
+    "fairing",
+    "launchEscape",
+)
+ENGINEFIELDS = ("burnTime", "thrustSL", "thrustV", "thrustProfile")
+STAGEFIELDS = ("emptyMass", "grossMass", "engines", "hotSeparation")
+
+
+def checkFields(where, value, allowed, required):
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be an object")
+    for field in value:
+        if field not in allowed:
+            raise ValueError(f"{where} has an unknown field {field!r}")
+    for field in required:
+        if field not in value:
+            raise ValueError(f"{where} is missing {field!r}")
+
+
+def checkNumber(where, value, minimum=0.0):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where} must be a number")
+    if value < minimum:
+        raise ValueError(f"{where} must be at least {minimum:g}")
+    return value
+
+
+def checkDefinition(definition, where):
+    checkFields(where, definition, ROCKETFIELDS, ("name", "engines", "stages"))
+    for field in ("name", "button"):
+        if field in definition and not isinstance(definition[field], str):
+            raise ValueError(f"{where}: {field} must be a string")
+    for field in ("diameter", "fairing", "launchEscape"):
+        if field in definition:
+            checkNumber(f"{where}: {field}", definition[field])
+
+    engines = definition["engines"]
+    if not isinstance(engines, dict):
+        raise ValueError(f"{where}: engines must be an object")
+    for name, engine in engines.items():
+        at = f"{where}: engine {name}"
+        checkFields(at, engine, ENGINEFIELDS, ENGINEFIELDS[:3])
+        checkNumber(f"{at}: burnTime", engine["burnTime"], 1e-9)
+        checkNumber(f"{at}: thrustSL", engine["thrustSL"])
+        checkNumber(f"{at}: thrustV", engine["thrustV"])
+        profile = engine.get("thrustProfile")
+        if profile is not None:
+            if not isinstance(profile, list) or not profile:
+                raise ValueError(f"{at}: thrustProfile must be a list of knots")
+            previous = -1.0
+            for knot in profile:
+                if not isinstance(knot, list) or len(knot) != 2:
+                    raise ValueError(f"{at}: knot {knot!r} must be [seconds, fraction]")
+                checkNumber(f"{at}: knot time", knot[0], previous + 1e-9)
+                checkNumber(f"{at}: knot fraction", knot[1])
+                previous = knot[0]
+
+    stages = definition["stages"]
+    checkFields(f"{where}: stages", stages, STAGENAMES, ("first",))
+    if "third" in stages and "second" not in stages:
+        raise ValueError(f"{where}: a third stage needs a second stage")
+    for stageName, stage in stages.items():
+        at = f"{where}: {stageName} stage"
+        checkFields(at, stage, STAGEFIELDS, STAGEFIELDS[:3])
+        checkNumber(f"{at}: emptyMass", stage["emptyMass"])
+        checkNumber(f"{at}: grossMass", stage["grossMass"], stage["emptyMass"])
+        if not isinstance(stage.get("hotSeparation", False), bool):
+            raise ValueError(f"{at}: hotSeparation must be true or false")
+        if (
+            not isinstance(stage["engines"], list)
+            or not 1 <= len(stage["engines"]) <= 2
+        ):
+            raise ValueError(f"{at} must have one or two [engine, count] pairs")
+        for pair in stage["engines"]:
+            if not isinstance(pair, list) or len(pair) != 2 or pair[0] not in engines:
+                raise ValueError(f"{at}: {pair!r} is not a known [engine, count] pair")
+            if isinstance(pair[1], bool) or not isinstance(pair[1], int) or pair[1] < 1:
+                raise ValueError(f"{at}: the count of {pair[0]} must be at least 1")
+
+    payload = definition.get("payload", {"name": "", "mass": 0})
+    checkFields(f"{where}: payload", payload, ("name", "mass"), ("name", "mass"))
+    if not isinstance(payload["name"], str):
+        raise ValueError(f"{where}: the payload name must be a string")
+    checkNumber(f"{where}: payload mass", payload["mass"])
+
+
+def compileRocket(definition, where):
+    checkDefinition(definition, where)
+    engines = definition["engines"]
+
+    def engine(name):
+        spec = engines[name]
+        return Engine(
+            name,
+            spec["burnTime"],
+            spec["thrustSL"],
+            spec["thrustV"],
+            spec.get("thrustProfile"),
+        )
+
+    def stage(name):
+        spec = definition["stages"].get(name)
+        if spec is None:
+            return Stage(0, 0, Engine(None, -1), 0, False, Engine(None, -1))
+        pairs = spec["engines"]
+        eng2, eng2Count = Engine(None, -1), 0
+        if len(pairs) > 1:
+            eng2, eng2Count = engine(pairs[1][0]), pairs[1][1]
+        return Stage(
+            spec["emptyMass"],
+            spec["grossMass"],
+            engine(pairs[0][0]),
+            pairs[0][1],
+            spec.get("hotSeparation", False),
+            eng2,
+            eng2Count,
+        )
+
+    payload = definition.get("payload", {"name": "", "mass": 0})
+    return Rocket(
+        definition["name"],
+        stage("first"),
+        Fairing(definition.get("fairing", 0)),
+        Payload(payload["name"], payload["mass"]),
+        stage("second"),
+        stage("boosters"),
+        stage("third"),
+        LaunchEscapeTower(definition.get("launchEscape", 0)),
+        diameter=definition.get("diameter", 0.0),
+    )
+
+
+def loadRocket(path, cacheDir=CACHEDIR):
+    with open(path, "rb") as file:
+        data = file.read()
+    digest = hashlib.sha256(f"{COMPILEDVERSION};{SLOTS};".encode() + data).hexdigest()
+    compiled = os.path.join(cacheDir, digest + ".pickle")
+    try:
+        with open(compiled, "rb") as file:
+            return pickle.load(file)
+    except (
+        OSError,
+        EOFError,
+        pickle.UnpicklingError,
+        # pickled by rocket classes that have changed since
+        AttributeError,
+        TypeError,
+        ImportError,
+        IndexError,
+        ValueError,
+    ):
+        pass
+    try:
+        definition = json.loads(data)
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from None
+    rocket = compileRocket(definition, path)
+    # written under a name of its own first, so parallel workers never mix files
+    os.makedirs(cacheDir, exist_ok=True)
+    temporary = f"{compiled}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        pickle.dump(rocket, file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, compiled)
+    return rocket
+
+
+def scanIndex(path=LIBRARYPATH, cacheDir=CACHEDIR):
+    # key -> {"name", "button", "signature"} of every definition, in key order
+    indexPath = os.path.join(cacheDir, "index.json")
+    try:
+        with open(indexPath) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        cached = {}
+    index = {}
+    for entry in os.scandir(path):
+        if not entry.name.endswith(".json"):
+            continue
+        key = entry.name[: -len(".json")]
+        stat = entry.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        item = cached.get(key)
+        if item is None or item["signature"] != signature:
+            try:
+                with open(entry.path) as file:
+                    definition = json.load(file)
+            except ValueError as error:
+                raise ValueError(f"{entry.path}: {error}") from None
+            if not isinstance(definition, dict):
+                raise ValueError(f"{entry.path} must hold an object")
+            item = {
+                "name": definition.get("name", key),
+                "button": definition.get("button"),
+                "signature": signature,
+            }
+        index[key] = item
+    index = dict(sorted(index.items(), key=lambda item: item[0].lower()))
+    if index != cached:
+        os.makedirs(cacheDir, exist_ok=True)
+        with open(indexPath + f".{os.getpid()}.tmp", "w") as file:
+            json.dump(index, file)
+        os.replace(indexPath + f".{os.getpid()}.tmp", indexPath)
+    return index
+
+
+class RocketLibrary(Mapping):
+    def __init__(self, path=LIBRARYPATH, cacheDir=CACHEDIR):
+        self.path = path
+        self.cacheDir = cacheDir
+        self.entries = None  # the index, read on first use
+        self.rockets = {}  # key -> Rocket, built on first use
+
+    def index(self):
+        if self.entries is None:
+            self.entries = scanIndex(self.path, self.cacheDir)
+        return self.entries
+
+    def __getitem__(self, key):
+        if key not in self.rockets:
+            if key not in self.index():
+                raise KeyError(key)
+            self.rockets[key] = loadRocket(
+                os.path.join(self.path, key + ".json"), self.cacheDir
+            )
+        return self.rockets[key]
+
+    def __contains__(self, key):
+        return key in self.index()
+
+    def __iter__(self):
+        return iter(self.index())
+
+    def __len__(self):
+        return len(self.index())
+
+    def keyForName(self, name):
+        # e.g. for the display name stored in a recording
+        for key, entry in self.index().items():
+            if entry["name"] == name:
+                return key
+        return None
+
+
+ROCKETS = RocketLibrary()
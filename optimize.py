@@ -0,0 +1,289 @@
+# ----------------------------------PITCH PROGRAM OPTIMIZER----------------------------------
+# Searches for an autopilot profile that puts a rocket into its target orbit. A profile
+# is a two-segment pitch program (a steep pitch-over, then a shallow one, each with its
+# own rate and end altitude) and a throttle ramp over the burn, six numbers scaled to
+# [0, 1]. Nelder–Mead walks them towards the centre of Rocket.evaluateOutcome()'s
+# success band without needing derivatives of the flight. With more than one worker
+# the p worst vertices of the simplex are reflected at once (Lee & Wiswall's parallel
+# Nelder–Mead), so every round flies p candidates side by side. Flown candidates are
+# memoized in memory and, like sweep.py, on disk under a hash of the rocket, orbit and
+# profile, so restarting a search replays the flights it already made for free.
+
+import argparse, hashlib, json, math, os, time
+from multiprocessing import Pool
+
+from autopilot import Autopilot
+from flight import Flight, DT
+from integrators import INTEGRATORS
+from library import ROCKETS
+from orbit import GM, EARTHRADIUS, EARTHROTATION
+from sweep import CACHEVERSION, loadCached, storeCached
+
+CACHEDIR = os.path.join(".cache", "optimize")
+PROFILEDIR = os.path.join(".cache", "autopilot")
+BOUNDS = (
+    (0.05, 1.5),  # steep pitch rate, degrees/s
+    (0.05, 1.0),  # end of the steep pitch-over, fraction of the target altitude
+    (0.0, 1.0),  # shallow pitch rate, degrees/s
+    (0.0, 1.0),  # length of the shallow pitch-over, fraction of the target altitude
+    (0.7, 1.0),  # throttle at lift-off
+    (0.7, 1.0),  # throttle when the last stage burns out
+)
+SIMPLEXSTEP = 0.15  # size of the starting simplex, in scaled units
+MAXEVALUATIONS = 400
+TOLERANCE = 0.01  # stop once the cost is this low, about a tenth of the band
+
+
+def profile(rocket, orbit, point):
+    steep, steepEnd, shallow, shallowLength, throttleStart, throttleEnd = (
+        low + (high - low) * min(max(value, 0.0), 1.0)
+        for value, (low, high) in zip(point, BOUNDS)
+    )
+    target = rocket.orbits[orbit]
+    return Autopilot(
+        [
+            (steepEnd * target, steep),
+            ((steepEnd + shallowLength) * target, shallow),
+        ],
+        [(0.0, throttleStart), (rocket.totalBurnTime, throttleEnd)],
+        {"rocket": rocket.name, "orbit": orbit},
+    )
+
+
+def startingPoint(rocket, orbit):
+    # the rocket's own pitch program at full throttle
+    baseRate = rocket.pitchRate()
+    steepEnd, shallowEnd = rocket.pitchProgramAltitudes()
+    target = rocket.orbits[orbit]
+    values = (
+        2 * baseRate,
+        steepEnd / target,
+        baseRate,
+        (shallowEnd - steepEnd) / target,
+        1.0,
+        1.0,
+    )
+    return [
+        min(max((value - low) / (high - low), 0.0), 1.0)
+        for value, (low, high) in zip(values, BOUNDS)
+    ]
+
+
+def candidateKey(candidate):
+    rocketName, orbit, pilot, integrator, dt = candidate
+    definition = {
+        "version": CACHEVERSION,
+        "rocket": ROCKETS[rocketName].spec(),
+        "orbit": orbit,
+        "pitchProgram": pilot["pitchProgram"],
+        "throttleSchedule": pilot["throttleSchedule"],
+        "integrator": integrator,
+        "dt": dt,
+    }
+    encoded = json.dumps(definition, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def flyCandidate(candidate):
+    rocketName, orbit, pilot, integrator, dt = candidate
+    pilot = Autopilot(pilot["pitchProgram"], pilot["throttleSchedule"])
+    flight = Flight(
+        ROCKETS[rocketName], orbit, dt, INTEGRATORS[integrator](), autopilot=pilot
+    )
+    flight.run()
+    return {
+        "altitude": flight.altitude,
+        "velocity": flight.velocity,
+        "outcome": flight.rocket.evaluateOutcome(flight.altitude, flight.velocity),
+    }
+
+
+def cost(rocket, orbit, result):
+    # squared distance from the centre of the success band, in band half-widths
+    desiredVelocity = math.sqrt(GM / (EARTHRADIUS + result["altitude"]))
+    altitudeError = (result["altitude"] - rocket.orbits[orbit]) / rocket.correctionRange
+    velocityError = (result["velocity"] + EARTHROTATION - desiredVelocity) / 480
+    return altitudeError**2 + velocityError**2
+
+
+class Optimizer:
+    def __init__(
+        self,
+        rocketName,
+        orbit="LEO",
+        integrator="rk45",
+        dt=DT,
+        workers=None,
+        cacheDir=CACHEDIR,
+    ):
+        self.rocketName = rocketName
+        self.rocket = ROCKETS[rocketName]
+        self.orbit = orbit
+        self.integrator = integrator
+        self.dt = dt
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.cacheDir = cacheDir
+        self.memo = {}  # scaled point -> (cost, result)
+        self.flown = 0  # candidates actually flown, not found in a cache
+        self.evaluations = 0
+
+    def evaluate(self, points, pool):
+        points = [tuple(min(max(value, 0.0), 1.0) for value in p) for p in points]
+        missing = {}
+        for point in points:
+            if point not in self.memo and point not in missing:
+                pilot = profile(self.rocket, self.orbit, point).toDict()
+                candidate = (
+                    self.rocketName,
+                    self.orbit,
+                    pilot,
+                    self.integrator,
+                    self.dt,
+                )
+                missing[point] = (candidateKey(candidate), candidate)
+        toFly = []
+        for point, (key, candidate) in missing.items():
+            result = loadCached(self.cacheDir, key)
+            if result is None:
+                toFly.append(point)
+            else:
+                self.memo[point] = (cost(self.rocket, self.orbit, result), result)
+        if toFly:
+            flown = pool.map(flyCandidate, [missing[point][1] for point in toFly])
+            for point, result in zip(toFly, flown):
+                storeCached(self.cacheDir, missing[point][0], result)
+                self.memo[point] = (cost(self.rocket, self.orbit, result), result)
+            self.flown += len(toFly)
+        self.evaluations += len(points)
+        return points, [self.memo[point][0] for point in points]
+
+    def run(self, maxEvaluations=MAXEVALUATIONS, tolerance=TOLERANCE):
+        os.makedirs(self.cacheDir, exist_ok=True)
+        n = len(BOUNDS)
+        parallel = max(1, min(self.workers, n))
+        start = startingPoint(self.rocket, self.orbit)
+        simplex = [start]
+        for i in range(n):
+            vertex = list(start)
+            vertex[i] += SIMPLEXSTEP if vertex[i] + SIMPLEXSTEP <= 1 else -SIMPLEXSTEP
+            simplex.append(vertex)
+        with Pool(self.workers) as pool:
+            simplex, costs = self.evaluate(simplex, pool)
+            while self.evaluations < maxEvaluations:
+                order = sorted(range(n + 1), key=lambda i: costs[i])
+                simplex = [simplex[i] for i in order]
+                costs = [costs[i] for i in order]
+                if costs[0] <= tolerance or costs[-1] - costs[0] < 1e-9:
+                    break
+                if not self.improve(simplex, costs, parallel, pool):
+                    # nothing got better: shrink everything towards the best vertex
+                    shrunk, shrunkCosts = self.evaluate(
+                        [
+                            [b + 0.5 * (v - b) for b, v in zip(simplex[0], vertex)]
+                            for vertex in simplex[1:]
+                        ],
+                        pool,
+                    )
+                    simplex[1:], costs[1:] = shrunk, shrunkCosts
+        best = min(range(n + 1), key=lambda i: costs[i])
+        pilot = profile(self.rocket, self.orbit, simplex[best])
+        pilot.info.update(self.memo[tuple(simplex[best])][1])
+        pilot.info["cost"] = costs[best]
+        return pilot
+
+    def improve(self, simplex, costs, parallel, pool):
+        # moves the p worst vertices in place; returns whether any of them improved
+        n = len(simplex) - 1
+        kept = simplex[: n + 1 - parallel]
+        centroid = [sum(values) / len(kept) for values in zip(*kept)]
+        worst = list(range(n + 1 - parallel, n + 1))
+        worstKept = costs[n - parallel]
+
+        def towards(vertex, factor):
+            return [c + factor * (v - c) for c, v in zip(centroid, vertex)]
+
+        reflected, reflectedCosts = self.evaluate(
+            [towards(simplex[j], -1.0) for j in worst], pool
+        )
+        expand = [k for k, c in enumerate(reflectedCosts) if c < costs[0]]
+        expanded, expandedCosts = self.evaluate(
+            [towards(simplex[worst[k]], -2.0) for k in expand], pool
+        )
+        contract = [k for k, c in enumerate(reflectedCosts) if c >= worstKept]
+        contracted, contractedCosts = self.evaluate(
+            [
+                towards(
+                    reflected[k] if reflectedCosts[k] < costs[worst[k]] else simplex[j],
+                    0.5,
+                )
+                for k, j in ((k, worst[k]) for k in contract)
+            ],
+            pool,
+        )
+        improved = False
+        candidates = {k: (reflected[k], reflectedCosts[k]) for k in range(parallel)}
+        for k, point, c in zip(expand, expanded, expandedCosts):
+            if c < candidates[k][1]:
+                candidates[k] = (point, c)
+        for k, point, c in zip(contract, contracted, contractedCosts):
+            candidates[k] = (point, c) if c < costs[worst[k]] else (None, None)
+        for k, j in enumerate(worst):
+            point, c = candidates[k]
+            if point is not None and c < costs[j]:
+                simplex[j], costs[j] = list(point), c
+                improved = True
+        return improved
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search for an autopilot profile that reaches the target orbit."
+    )
+    parser.add_argument("rocket", choices=ROCKETS.keys())
+    parser.add_argument(
+        "orbit", nargs="?", default="LEO", choices=["LEO", "SSO", "GTO"]
+    )
+    parser.add_argument("--integrator", default="rk45", choices=INTEGRATORS.keys())
+    parser.add_argument(
+        "--dt", type=float, default=DT, help="physics time step in seconds"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    parser.add_argument("--max-evaluations", type=int, default=MAXEVALUATIONS)
+    parser.add_argument("--cache-dir", default=CACHEDIR)
+    parser.add_argument("--out", help="where to save the profile")
+    args = parser.parse_args()
+
+    optimizer = Optimizer(
+        args.rocket, args.orbit, args.integrator, args.dt, args.workers, args.cache_dir
+    )
+    start = time.perf_counter()
+    pilot = optimizer.run(args.max_evaluations)
+    elapsed = time.perf_counter() - start
+
+    path = args.out
+    if path is None:
+        os.makedirs(PROFILEDIR, exist_ok=True)
+        path = os.path.join(
+            PROFILEDIR, f"{args.rocket.lower()}_{args.orbit.lower()}.json"
+        )
+    pilot.save(path)
+
+    info = pilot.info
+    for altitude, rate in pilot.pitchProgram:
+        print(f"pitch {rate:.4f} deg/s up to {altitude / 1000:.2f} km")
+    for t, throttle in pilot.throttleSchedule:
+        print(f"throttle {throttle * 100:.0f}% at T+{t:.0f} s")
+    print(
+        f"\n{info['outcome']}: {info['altitude'] / 1000:.2f} km, "
+        f"{info['velocity'] + 460:.1f} m/s (cost {info['cost']:.4f})"
+    )
+    print(
+        f"{optimizer.evaluations} candidates in {elapsed:.2f} s "
+        f"({optimizer.flown} flown), saved to {path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ----------------------------------KEPLERIAN ORBIT----------------------------------
+# Once every stage has burned out nothing but gravity acts on the rocket, so its path
+# is a conic section. The burnout state is turned into orbital elements once, with the
+# same GM and Earth radius as Rocket.Fg(), and the state at any later time is found by
+# solving Kepler's equation: a query costs a few Newton iterations however far ahead
+# it looks, and no integration error builds up along the way. As in
+# Rocket.findAcceleration(), the tangential speed is the flight velocity plus the 460
+# m/s the launch site gets from Earth's rotation.
+
+import math
+
+GM = 6.67 * (10**-11) * 5.97219 * (10**24)  # unit: m³/s²
+EARTHRADIUS = 6378000  # unit: m
+EARTHROTATION = 460  # unit: m/s
+KEPLERTOLERANCE = 1e-12
+KEPLERITERATIONS = 50
+
+
+class Orbit:
+    __slots__ = ("epoch", "t0", "h", "a", "p", "e", "n", "bound", "m0")
+
+    def __init__(self, t, altitude, radialVelocity, tangentialVelocity):
+        self.epoch = (t, altitude, radialVelocity, tangentialVelocity)
+        self.t0 = t  # unit: s
+        r = EARTHRADIUS + altitude
+        self.h = r * tangentialVelocity  # unit: m²/s, specific angular momentum
+        energy = (radialVelocity**2 + tangentialVelocity**2) / 2 - GM / r
+        self.a = -GM / (2 * energy)  # unit: m, negative when the orbit is unbound
+        self.p = self.h**2 / GM  # unit: m, semi-latus rectum
+        self.e = math.sqrt(max(1 - self.p / self.a, 0.0))
+        self.n = math.sqrt(GM / abs(self.a) ** 3)  # unit: rad/s, mean motion
+        self.bound = self.a > 0
+        # e·sin of the anomaly comes from the radial velocity, e·cos from the radius
+        if self.bound:
+            eSin = r * radialVelocity / math.sqrt(GM * self.a)
+            anomaly = math.atan2(eSin, 1 - r / self.a)
+            self.m0 = anomaly - eSin
+        else:
+            eSinh = r * radialVelocity / math.sqrt(-GM * self.a)
+            self.m0 = eSinh - math.asinh(eSinh / self.e)
+
+    @property
+    def perigee(self):
+        return self.p / (1 + self.e) - EARTHRADIUS  # unit: m
+
+    @property
+    def apogee(self):
+        if not self.bound:
+            return math.inf
+        return self.p / (1 - self.e) - EARTHRADIUS  # unit: m
+
+    @property
+    def period(self):
+        if not self.bound:
+            return math.inf
+        return 2 * math.pi / self.n  # unit: s
+
+    def anomaly(self, t):
+        # eccentric (or hyperbolic) anomaly at t, by Newton's method
+        m = self.m0 + self.n * (t - self.t0)
+        e = self.e
+        if self.bound:
+            turns = math.floor((m + math.pi) / (2 * math.pi)) * 2 * math.pi
+            m -= turns  # within [-π, π), where the iteration converges fastest
+            anomaly = m if e < 0.8 else math.copysign(math.pi, m)
+            for _ in range(KEPLERITERATIONS):
+                change = (anomaly - e * math.sin(anomaly) - m) / (
+                    1 - e * math.cos(anomaly)
+                )
+                anomaly -= change
+                if abs(change) < KEPLERTOLERANCE:
+                    break
+            return anomaly + turns
+        anomaly = math.asinh(m / e)
+        for _ in range(KEPLERITERATIONS):
+            change = (e * math.sinh(anomaly) - anomaly - m) / (
+                e * math.cosh(anomaly) - 1
+            )
+            anomaly -= change
+            if abs(change) < KEPLERTOLERANCE:
+                break
+        return anomaly
+
+    def state(self, t):
+        # altitude (m), radial and tangential velocity (m/s) at t
+        anomaly = self.anomaly(t)
+        if self.bound:
+            r = self.a * (1 - self.e * math.cos(anomaly))
+            radialVelocity = math.sqrt(GM * self.a) * self.e * math.sin(anomaly) / r
+        else:
+            r = self.a * (1 - self.e * math.cosh(anomaly))
+            radialVelocity = math.sqrt(-GM * self.a) * self.e * math.sinh(anomaly) / r
+        return r - EARTHRADIUS, radialVelocity, self.h / r
+
+    def altitude(self, t):
+        return self.state(t)[0]
+
+    def speed(self, t):
+        # vis-viva
+        r = EARTHRADIUS + self.altitude(t)
+        return math.sqrt(GM * (2 / r - 1 / self.a))
@@ -0,0 +1,124 @@
+# ----------------------------------FRAME PROFILER----------------------------------
+# Times the phases of each frame of the flight screen (input, physics and staging,
+# the model, the telemetry text, the event log and presenting the frame) into a ring
+# of the last few hundred frames, and draws the rolling average of each phase, a
+# histogram of whole-frame times and the number of frames that missed the frame-rate
+# deadline as an overlay. While the overlay is hidden, begin(), mark() and end() are
+# bound to a method that does nothing, so the main loop pays one empty call each.
+# Shown partway through a frame, the overlay starts timing with the next begin().
+
+import time
+
+import numpy as np
+import pygame
+
+PHASES = ("input", "physics", "model", "telemetry", "event log", "flip")
+INPUT, PHYSICS, MODEL, TELEMETRY, EVENTLOG, FLIP = range(len(PHASES))
+HISTORY = 300  # unit: frames
+DEADLINESLACK = 2.0  # unit: ms, the frame clock only waits in whole milliseconds
+REFRESH = 15  # unit: frames, between redraws of the overlay
+HISTOGRAMBINS = 24
+HISTOGRAMSIZE = (216, 48)  # unit: px
+BARCOLOR = (170, 255, 0)
+LATECOLOR = (255, 80, 0)
+
+
+class FrameProfiler:
+    def __init__(self, fps, history=HISTORY):
+        self.deadline = 1000.0 / fps  # unit: ms
+        self.times = np.zeros((history, len(PHASES)))  # unit: ms
+        self.frames = 0  # recorded since the overlay was shown
+        self.missed = 0
+        self.row = 0
+        self.frameTime = 0.0  # unit: ms
+        self.last = 0.0
+        self.visible = False
+        self.surfaces = []
+        self.begin = self.mark = self.end = self.skip
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.times[:] = 0.0
+            self.frames = self.missed = 0
+            self.surfaces = []
+            self.begin = self.arm
+        else:
+            self.begin = self.mark = self.end = self.skip
+
+    def skip(self, *args):
+        pass
+
+    def arm(self, frameTime):
+        self.begin, self.mark, self.end = self.startFrame, self.record, self.finish
+        self.startFrame(frameTime)
+
+    def startFrame(self, frameTime):
+        # frameTime: what the frame clock's tick() returned, in ms
+        # (a frame that never reaches finish() is simply overwritten by the next)
+        self.row = self.frames % len(self.times)
+        self.times[self.row] = 0.0
+        self.frameTime = frameTime
+        self.last = time.perf_counter()
+
+    def record(self, phase):
+        # the time since the previous mark goes to phase
+        now = time.perf_counter()
+        self.times[self.row, phase] += (now - self.last) * 1000
+        self.last = now
+
+    def finish(self):
+        if self.frameTime > self.deadline + DEADLINESLACK:
+            self.missed += 1
+        self.frames += 1
+
+    def draw(self, renderer, text, position):
+        # the overlay, with its top right corner at position
+        if not self.visible:
+            return
+        if self.frames % REFRESH == 0 or not self.surfaces:
+            self.surfaces = self.render(text)
+        x, y = position
+        for index, surface in enumerate(self.surfaces):
+            renderer.draw(("profiler", index), surface, (x - surface.get_width(), y))
+            y += surface.get_height() + 2
+
+    def render(self, text):
+        recorded = self.times[: min(self.frames, len(self.times))]
+        if len(recorded) == 0:
+            return [text.field(("profiler", 0), "Profiling...")]
+        averages = recorded.mean(axis=0)
+        totals = recorded.sum(axis=1)
+        lines = [
+            f"{name:<10}{average:>7.2f} ms" for name, average in zip(PHASES, averages)
+        ]
+        lines.append(f"{'frame':<10}{totals.mean():>7.2f} ms")
+        lines.append(f"{'worst':<10}{totals.max():>7.2f} ms")
+        lines.append(f"missed {self.missed} of {self.frames} deadlines")
+        surfaces = [
+            text.field(("profiler", index), line) for index, line in enumerate(lines)
+        ]
+        surfaces.append(self.histogram(totals))
+        return surfaces
+
+    def histogram(self, totals):
+        # whole-frame times from 0 to twice the deadline, the last bin holding the rest
+        width, height = HISTOGRAMSIZE
+        counts, _ = np.histogram(
+            np.minimum(totals, 2 * self.deadline * 0.9999),
+            HISTOGRAMBINS,
+            (0.0, 2 * self.deadline),
+        )
+        surface = pygame.Surface(HISTOGRAMSIZE, pygame.SRCALPHA)
+        barWidth = width // HISTOGRAMBINS
+        for index, count in enumerate(counts):
+            if count == 0:
+                continue
+            barHeight = max(1, round(height * count / counts.max()))
+            late = index >= HISTOGRAMBINS // 2
+            pygame.draw.rect(
+                surface,
+                LATECOLOR if late else BARCOLOR,
+                (index * barWidth, height - barHeight, barWidth - 1, barHeight),
+            )
+        return surface
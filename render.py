@@ -0,0 +1,70 @@
+# ----------------------------------DIRTY RECTANGLES----------------------------------
+# Widgets are handed to the renderer every frame instead of being blitted straight to
+# the window. It remembers what was drawn where in the previous frame and only redraws
+# and pushes to the display the rectangles whose widget appeared, moved, changed its
+# surface or disappeared, so a screen where nothing moves costs almost nothing.
+
+import pygame
+
+
+class Renderer:
+    def __init__(self, window):
+        self.window = window
+        self.screen = None
+        self.background = None
+        self.redrawAll = True
+        self.items = {}  # key -> (surface, rect), in drawing order
+        self.drawn = {}  # the items that are on the window right now
+
+    def begin(self, screen, background):
+        # background is a colour or a surface as big as the window
+        self.redrawAll = self.redrawAll or screen != self.screen
+        self.screen = screen
+        self.background = background
+        self.items = {}
+
+    def draw(self, key, surface, position):
+        self.items[key] = (surface, surface.get_rect(topleft=position))
+
+    def invalidate(self):
+        self.redrawAll = True
+
+    def clear(self, rect):
+        if isinstance(self.background, pygame.Surface):
+            self.window.blit(self.background, rect, rect)
+        else:
+            self.window.fill(self.background, rect)
+
+    def damaged(self):
+        rects = []
+        for key, (surface, rect) in self.items.items():
+            old = self.drawn.get(key)
+            if old is None or old[0] is not surface or old[1] != rect:
+                rects.append(rect)
+                if old is not None:
+                    rects.append(old[1])
+        for key, (surface, rect) in self.drawn.items():
+            if key not in self.items:
+                rects.append(rect)
+        return rects
+
+    def present(self):
+        if self.redrawAll:
+            self.clear(self.window.get_rect())
+            for surface, rect in self.items.values():
+                self.window.blit(surface, rect)
+            pygame.display.flip()
+            self.redrawAll = False
+        else:
+            rects = self.damaged()
+            for damaged in rects:
+                # everything overlapping the rectangle is drawn again, clipped to it
+                self.window.set_clip(damaged)
+                self.clear(damaged)
+                for surface, rect in self.items.values():
+                    if rect.colliderect(damaged):
+                        self.window.blit(surface, rect)
+            self.window.set_clip(None)
+            if rects:
+                pygame.display.update(rects)
+        self.drawn = self.items
@@ -0,0 +1,102 @@
+# ----------------------------------REPLAY----------------------------------
+# Plays a recorded flight back on the flight screen. The playback position is a time
+# that advances with the wall clock times the playback speed, and the record to show
+# is found by binary search over the memory-mapped record times, so seeking anywhere
+# in a recording is O(log n) and a slow frame simply skips the records it missed.
+
+import argparse, bisect
+
+import numpy as np
+
+from library import ROCKETS
+from telemetry import TelemetryFile
+
+SPEEDS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+SEEKSTEP = 10.0  # unit: s
+
+
+class Replay:
+    def __init__(self, path):
+        self.path = path
+        self.recording = TelemetryFile(path)
+        if len(self.recording) == 0:
+            raise ValueError(f"{path} has no records")
+        self.records = self.recording.records
+        # one contiguous copy of the record times is the index every seek searches
+        self.times = np.ascontiguousarray(self.records["t"])
+        self.eventTimes = [t for _, t, _ in self.recording.events]
+        name = self.recording.info.get("rocket")
+        key = name if name in ROCKETS else ROCKETS.keyForName(name)
+        if key is None:
+            raise ValueError(f"{path} was recorded with an unknown rocket")
+        self.rocket = ROCKETS[key].instance()
+        self.orbit = self.recording.info.get("orbit", "LEO")
+        self.rocket.orbit = self.orbit  # shown on the flight screen
+        self.start = float(self.times[0])
+        self.end = float(self.times[-1])
+        self.time = self.start  # unit: s, the playback position
+        self.speed = 1.0
+        self.paused = False
+
+    def seek(self, t):
+        self.time = min(max(t, self.start), self.end)
+
+    def changeSpeed(self, steps):
+        index = SPEEDS.index(self.speed) + steps
+        self.speed = SPEEDS[min(max(index, 0), len(SPEEDS) - 1)]
+
+    def previousEvent(self):
+        # a little before the current time, so repeated presses keep going back
+        index = bisect.bisect_left(self.eventTimes, self.time - 0.5)
+        self.seek(self.eventTimes[index - 1] if index > 0 else self.start)
+
+    def nextEvent(self):
+        index = bisect.bisect_right(self.eventTimes, self.time + 1e-6)
+        self.seek(self.eventTimes[index] if index < len(self.eventTimes) else self.end)
+
+    def advance(self, frameTime):
+        # the events played through on this frame
+        if self.paused:
+            return []
+        previous = self.time
+        self.seek(self.time + frameTime * self.speed)
+        if self.time >= self.end:
+            self.paused = True
+        return self.eventsBetween(previous, self.time)
+
+    def eventsBetween(self, start, end):
+        first = bisect.bisect_right(self.eventTimes, start)
+        last = bisect.bisect_right(self.eventTimes, end)
+        return [message for _, _, message in self.recording.events[first:last]]
+
+    def state(self):
+        # the record at the playback position, blended with the next one
+        index = int(np.searchsorted(self.times, self.time, side="right")) - 1
+        index = min(max(index, 0), len(self.records) - 1)
+        current = self.records[index]
+        if index + 1 == len(self.records):
+            return {name: current[name] for name in self.records.dtype.names}
+        following = self.records[index + 1]
+        span = following["t"] - current["t"]
+        alpha = (self.time - current["t"]) / span if span > 0 else 0.0
+        state = {
+            name: current[name] + (following[name] - current[name]) * alpha
+            for name in self.records.dtype.names
+            if name != "status"
+        }
+        state["status"] = int(current["status"])
+        return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a recorded flight again.")
+    parser.add_argument("recording", help="a .tlm file from .cache/recordings")
+    args = parser.parse_args()
+
+    import main as game  # opens the window
+
+    game.main(args.recording)
+
+
+if __name__ == "__main__":
+    main()
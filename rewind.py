@@ -0,0 +1,99 @@
+# ----------------------------------REWIND----------------------------------
+# Keeps the last few minutes of a flight in memory so the player can step back and fly
+# a stretch again. Every REWINDINTERVAL seconds of flight time, at most once per
+# rendered frame, the flight is saved with Flight.snapshot(). Every KEYFRAMEINTERVAL-th
+# snapshot is kept whole as a keyframe; the ones in between keep only the values that
+# differ from their keyframe and where they sit, a few dozen numbers while a stage
+# burns. Once the buffer holds more than its memory cap, the oldest keyframe goes with
+# all of its deltas, so the memory used stays the same however long the flight. Going
+# back needs one keyframe and at most one delta, wherever it lands.
+
+import sys
+from collections import deque
+
+import numpy as np
+
+REWINDINTERVAL = 0.5  # unit: s of flight time between snapshots
+KEYFRAMEINTERVAL = 32  # snapshots per keyframe
+REWINDMEMORY = 1024 * 1024  # unit: bytes, about a quarter of an hour of flight
+REWINDSTEP = 5.0  # unit: s of flight time per press of the rewind key
+ENTRYSIZE = 120  # unit: bytes, of the tuple holding one snapshot and its numbers
+
+
+class Rewind:
+    def __init__(
+        self,
+        memory=REWINDMEMORY,
+        interval=REWINDINTERVAL,
+        keyframeInterval=KEYFRAMEINTERVAL,
+    ):
+        self.memory = memory  # unit: bytes
+        self.interval = interval  # unit: s
+        self.keyframeInterval = keyframeInterval
+        # [keyframe, entries]; an entry is (t, records, positions, values), with the
+        # bit patterns of the snapshot as uint64 so NaNs compare like any other value
+        self.groups = deque()
+        self.used = 0  # unit: bytes
+        self.last = None  # time of the newest snapshot
+
+    def entrySize(self, positions, values):
+        return ENTRYSIZE + sys.getsizeof(positions) + sys.getsizeof(values)
+
+    def record(self, flight):
+        if self.last is not None and flight.t < self.last + self.interval:
+            return
+        self.last = flight.t
+        records = flight.recorder.records() if flight.recorder is not None else 0
+        current = np.frombuffer(flight.snapshot(), np.uint64).copy()
+        group = self.groups[-1] if self.groups else None
+        if (
+            group is None
+            or len(group[1]) >= self.keyframeInterval
+            or len(group[0]) != len(current)  # the staging queues grew or shrank
+        ):
+            group = [current, []]
+            self.groups.append(group)
+            self.used += sys.getsizeof(current)
+            entry = (flight.t, records, None, None)
+        else:
+            positions = np.flatnonzero(current != group[0]).astype(np.uint16)
+            entry = (flight.t, records, positions, current[positions])
+            self.used += self.entrySize(entry[2], entry[3])
+        group[1].append(entry)
+        while self.used > self.memory and len(self.groups) > 1:
+            self.drop(0)
+
+    def drop(self, index, first=0):
+        # forgets the entries of group index from first on, and the group with them
+        keyframe, entries = self.groups[index]
+        for _, _, positions, values in entries[first:]:
+            if positions is not None:
+                self.used -= self.entrySize(positions, values)
+        del entries[first:]
+        if not entries:
+            self.used -= sys.getsizeof(keyframe)
+            del self.groups[index]
+
+    def back(self, flight, seconds):
+        # puts the flight back to the newest snapshot at least seconds before now, or
+        # the oldest one there is; the snapshots after it are dropped as the flight
+        # goes on from there. Returns the time it went back to, None with no snapshots.
+        if not self.groups:
+            return None
+        target = flight.t - seconds
+        while len(self.groups) > 1 and self.groups[-1][1][0][0] > target:
+            self.drop(len(self.groups) - 1)
+        keyframe, entries = self.groups[-1]
+        index = len(entries) - 1
+        while index > 0 and entries[index][0] > target:
+            index -= 1
+        self.drop(len(self.groups) - 1, index + 1)
+        t, records, positions, values = entries[index]
+        state = keyframe.copy()
+        if positions is not None:
+            state[positions] = values
+        flight.restore(state.view(np.float64).tolist())
+        if flight.recorder is not None:
+            flight.recorder.truncate(records)
+        self.last = t
+        return t
@@ -0,0 +1,684 @@
+import math
+from bisect import bisect_right
+from copy import deepcopy
+
+from atmosphere import (
+    DENSITY,
+    PRESSURE,
+    SPEEDOFSOUND,
+    SEALEVELPRESSURE,
+    TABLESTEP,
+    LASTINDEX,
+    TOP,
+    tableRow,
+)
+
+# Rocket.status keeps one bit per character of the status code used in the names of the
+# images in Rockets/: for the first stage, boosters, second and third stage whether
+# the stage exists and whether each of its engines fires, then the launch escape tower
+# and the fairing. Components flip the bits of every rocket watching them when they
+# change, so the code is never rebuilt while flying.
+STAGEBITS = (0, 3, 6, 9)  # bit of each stage, its engines follow
+# drag coefficient of a slender rocket by Mach number, peaking in the transonic range,
+# resampled at import onto a table evenly spaced in Mach
+DRAGPROFILE = (
+    (0.0, 0.30),
+    (0.6, 0.30),
+    (0.9, 0.40),
+    (1.1, 0.60),
+    (1.5, 0.50),
+    (2.0, 0.40),
+    (3.0, 0.30),
+    (5.0, 0.25),
+    (10.0, 0.20),
+)
+MACHSTEP = 0.1
+LIFTSLOPE = 2.0  # unit: 1/rad, normal-force coefficient slope of a slender body
+PROFILESTEP = 1.0  # unit: s, spacing of an engine's thrust-vs-burn-time table
+THRUSTTABLES = {}  # (thrustSL, thrustV) -> thrust at each row of the atmosphere tables
+PROFILETABLES = {}  # (thrustProfile, burn time) -> resampled thrust profile
+
+
+def resample(knots, step, end):
+    # the piecewise linear curve through the (x, y) knots every step from 0 to end,
+    # held at its first and last y beyond the knots
+    xs, ys = zip(*knots)
+    values = []
+    for index in range(math.ceil(end / step)):
+        x = index * step
+        knot = bisect_right(xs, x) - 1
+        if knot < 0:
+            values.append(ys[0])
+        elif knot >= len(xs) - 1:
+            values.append(ys[-1])
+        else:
+            slope = (ys[knot + 1] - ys[knot]) / (xs[knot + 1] - xs[knot])
+            values.append(slope * (x - xs[knot]) + ys[knot])
+    return values
+
+
+DRAGCOEFFICIENTS = resample(DRAGPROFILE, MACHSTEP, DRAGPROFILE[-1][0] + MACHSTEP / 2)
+
+
+def setFlag(watchers, value):
+    for rocket, bit in watchers:
+        if value:
+            rocket.status |= bit
+        else:
+            rocket.status &= ~bit
+
+
+def statusFromString(code):
+    status = 0
+    for position, char in enumerate(code):
+        if char in "13":
+            status |= 1 << position
+    return status
+
+
+# ----------------------------------ROCKET COMPONENTS------------------------------------
+
+
+def copyComponent(component):
+    # a new object with the same slots, watched by nobody yet; lists and dicts (orbits,
+    # thrust profiles) are copied too, so nothing the copy changes reaches the original
+    copy = object.__new__(type(component))
+    for name in type(component).__slots__:
+        value = getattr(component, name)
+        if name == "watchers":
+            value = []
+        elif isinstance(value, (list, dict)):
+            value = deepcopy(value)
+        setattr(copy, name, value)
+    return copy
+
+
+def thrustTable(thrustSL, thrustV):
+    # thrust (kN) at every row of the atmosphere tables, shared by equal engines
+    key = (thrustSL, thrustV)
+    if key not in THRUSTTABLES:
+        THRUSTTABLES[key] = tuple(
+            thrustV - (thrustV - thrustSL) * p / SEALEVELPRESSURE for p in PRESSURE
+        )
+    return THRUSTTABLES[key]
+
+
+def profileTable(thrustProfile, time):
+    # fraction of full thrust every PROFILESTEP seconds of the burn, or None
+    if thrustProfile is None:
+        return None
+    key = (tuple(map(tuple, thrustProfile)), time)
+    if key not in PROFILETABLES:
+        PROFILETABLES[key] = tuple(
+            resample(thrustProfile, PROFILESTEP, max(time, PROFILESTEP) + PROFILESTEP)
+        )
+    return PROFILETABLES[key]
+
+
+class Engine:
+    # Thrust falls off linearly with the ambient pressure pushing on the nozzle exit,
+    # from thrustV in vacuum to thrustSL at sea level. It is worked out once per row of
+    # the atmosphere tables, so a lookup is one interpolation, and it fades smoothly
+    # into the vacuum thrust instead of stepping at some altitude. thrustProfile, if
+    # given, is (seconds burned, fraction of full thrust) knots, e.g. a solid motor's
+    # thrust curve or a throttle-down, resampled every PROFILESTEP seconds. The tables
+    # are shared by every engine with the same thrust and are left out of pickles.
+    __slots__ = (
+        "name",
+        "thrustSL",
+        "thrustV",
+        "burnTime",
+        "ratedBurnTime",
+        "thrustProfile",
+        "thrustTable",
+        "profileTable",
+        "fire",
+        "watchers",
+    )
+    STATEFIELDS = {"burnTime": float, "fire": bool}  # what changes in flight
+
+    def __init__(self, name, time, thrustSL=0, thrustV=0, thrustProfile=None):
+        self.name = name
+        self.thrustSL = thrustSL  # unit: kN
+        self.thrustV = thrustV  # unit: kN
+        self.burnTime = time  # unit: s, of simulated time left to burn
+        self.ratedBurnTime = time  # unit: s
+        self.thrustProfile = thrustProfile
+        self.thrustTable = thrustTable(thrustSL, thrustV)
+        self.profileTable = profileTable(thrustProfile, time)
+        self.fire = False
+        self.watchers = []  # (rocket, status bit)
+
+    def __getstate__(self):
+        return {
+            name: getattr(self, name)
+            for name in Engine.__slots__
+            if name not in ("thrustTable", "profileTable")
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.thrustTable = thrustTable(self.thrustSL, self.thrustV)
+        self.profileTable = profileTable(self.thrustProfile, self.ratedBurnTime)
+
+    def profileFraction(self, burned):
+        # fraction of full thrust burned seconds into the burn
+        last = len(self.profileTable) - 1
+        burned = min(burned / PROFILESTEP, last)
+        index = min(int(burned), last - 1)
+        return self.profileTable[index] + (
+            self.profileTable[index + 1] - self.profileTable[index]
+        ) * (burned - index)
+
+    def thrust(self, row, burned):
+        # thrust (kN) at atmosphere.tableRow() row, burned seconds into the burn
+        index, fraction = row
+        table = self.thrustTable
+        thrust = table[index] + (table[index + 1] - table[index]) * fraction
+        if self.profileTable is not None:
+            thrust *= self.profileFraction(burned)
+        return thrust
+
+    def run(self, row, dt):
+        # row: atmosphere.tableRow() of the altitude
+        if not self.fire:
+            self.fire = True
+            setFlag(self.watchers, True)
+        thrust = self.thrust(row, self.ratedBurnTime - self.burnTime)
+        self.burnTime -= dt
+        return thrust
+
+    def shutDown(self):
+        self.burnTime = -1
+        if self.fire:
+            self.fire = False
+            setFlag(self.watchers, False)
+
+
+class Stage:
+    __slots__ = (
+        "emptyMass",
+        "mass",
+        "eng1",
+        "eng1Count",
+        "eng2",
+        "eng2Count",
+        "hotSeparation",
+        "runHotSeparation",
+        "eng1FuelConsumption",
+        "eng2FuelConsumption",
+        "fireStage",
+        "readySeparate",
+        "separateTimer",
+        "watchers",
+    )
+    STATEFIELDS = {
+        "mass": float,
+        "eng1FuelConsumption": float,
+        "eng2FuelConsumption": float,
+        "separateTimer": float,
+        "fireStage": bool,
+        "readySeparate": bool,
+        "runHotSeparation": bool,
+    }
+
+    def __init__(
+        self,
+        emptyMass=0,
+        grossMass=0,
+        eng1=Engine(None, -1),
+        eng1Count=0,
+        hotSeparation=False,
+        eng2=Engine(None, -1),
+        eng2Count=0,
+    ):
+        self.emptyMass = emptyMass
+        self.mass = grossMass
+        self.eng1 = eng1
+        self.eng1Count = eng1Count
+        self.eng2 = eng2
+        self.eng2Count = eng2Count
+        self.hotSeparation = hotSeparation
+        self.runHotSeparation = False
+        if self.eng2Count == 0 and self.eng1.burnTime != 0:
+            self.eng1FuelConsumption = (
+                self.mass - self.emptyMass
+            ) / self.eng1.burnTime  # unit: kg/s
+            self.eng2FuelConsumption = 0
+        elif self.eng2Count != 0 and self.eng1.burnTime != 0:
+            minTime = min(self.eng1.burnTime, self.eng2.burnTime)
+            maxTime = max(self.eng1.burnTime, self.eng2.burnTime)
+            self.eng1FuelConsumption = (self.mass - self.emptyMass) / (
+                2 * minTime + maxTime - minTime
+            )
+            self.eng2FuelConsumption = self.eng1FuelConsumption  # units: kg/s
+        else:
+            self.eng1FuelConsumption = self.eng2FuelConsumption = 0
+        self.fireStage = False
+        self.readySeparate = False
+        self.separateTimer = 0.0
+        self.watchers = []  # (rocket, status bit)
+
+    def engines(self):
+        # (engine, count) of the engines that have not been shut down
+        running = []
+        if self.eng1.burnTime != -1:
+            running.append((self.eng1, self.eng1Count))
+        if self.eng2.burnTime != -1 and self.eng2Count != 0:
+            running.append((self.eng2, self.eng2Count))
+        return running
+
+    def ignition(self, row, dt=0.0):
+        thrust = 0
+        for engine, count in self.engines():
+            thrust += engine.run(row, dt) * count
+        return thrust
+
+    def burn(self, dt):
+        rate = self.eng1FuelConsumption + self.eng2FuelConsumption  # unit: kg/s
+        self.mass -= rate * dt
+        return rate
+
+    def separate(self):
+        self.mass = 0
+        setFlag(self.watchers, False)
+        self.eng1.shutDown()
+        self.eng2.shutDown()
+        self.eng1FuelConsumption = 0
+        self.eng2FuelConsumption = 0
+
+
+class Payload:
+    __slots__ = ("name", "mass")
+    STATEFIELDS = {}
+
+    def __init__(self, name, mass):
+        self.name = name
+        self.mass = mass  # unit: kg
+
+
+class LaunchEscapeTower:
+    __slots__ = ("mass", "watchers")
+    STATEFIELDS = {"mass": float}
+
+    def __init__(self, mass=0):
+        self.mass = mass  # unit: kg
+        self.watchers = []  # (rocket, status bit)
+
+    def separate(self):
+        self.mass = 0
+        setFlag(self.watchers, False)
+
+
+class Fairing:
+    __slots__ = ("mass", "watchers")
+    STATEFIELDS = {"mass": float}
+
+    def __init__(self, mass):
+        self.mass = mass  # unit: kg
+        self.watchers = []  # (rocket, status bit)
+
+    def separate(self):
+        self.mass = 0
+        setFlag(self.watchers, False)
+
+
+RESULTMESSAGES = {
+    "success": "Result: The launch into LEO was successful and its accuracy was fairly high.",
+    "fast": "Result: The launch into LEO was successful. The satellite/module/ship's velocity is considerably higher than desired, thus further velocity adjustments may need to be performed to reduce the centrifugal force.",
+    "slow": "Result: The launch into LEO was a partial-success. The satellite/module/ship's velocity is considerably lower than desired and its altitude may continue to drop. Further adjustments are needed to increase the centrifugal force.",
+    "high": "Result: The launch was a partial-success. The altitude acquired is considerably higher than the desired altitude, thus the satellite/module/ship may need to perform adjustments to raise its altitude.",
+    "low": "Result: The launch was a partial-success. The altitude acquired is considerably lower than the desired altitude, thus the satellite/module/ship may need to perform adjustments to raise its altitude.",
+    "failed": "Result: The launch had failed. The acquired altitude is unacceptably lower than the desired altitude.",
+}
+
+
+class Rocket:
+    __slots__ = (
+        "name",
+        "formattedName",
+        "boosters",
+        "firstStage",
+        "secondStage",
+        "thirdStage",
+        "payload",
+        "launchEscape",
+        "fairing",
+        "diameter",
+        "referenceArea",
+        "totalBurnTime",
+        "correctionRange",
+        "stopFlight",
+        "AOA",
+        "orbits",
+        "orbit",
+        "status",
+    )
+    STATEFIELDS = {"AOA": float, "status": int, "stopFlight": bool}
+
+    def __init__(
+        self,
+        name,
+        firstStage,
+        fairing,
+        payload,
+        secondStage=Stage(0),
+        booster=Stage(0),
+        thirdStage=Stage(0),
+        launchEscape=LaunchEscapeTower(0),
+        diameter=0.0,
+    ):
+        self.name = name
+        self.formattedName = ""
+        for char in self.name:
+            if char.isalpha() or (ord(char) >= 48 and ord(char) <= 57):
+                self.formattedName += char
+        self.formattedName = self.formattedName.lower()
+        self.boosters = booster
+        self.firstStage = firstStage
+        self.secondStage = secondStage
+        self.thirdStage = thirdStage
+        self.payload = payload
+        self.launchEscape = launchEscape
+        self.fairing = fairing
+        self.diameter = diameter  # unit: m
+        self.referenceArea = math.pi * diameter * diameter / 4  # unit: m²
+        self.totalBurnTime = (
+            max(self.firstStage.eng1.burnTime, self.firstStage.eng2.burnTime)
+            + max(self.secondStage.eng1.burnTime, self.secondStage.eng2.burnTime)
+            + max(self.thirdStage.eng1.burnTime, self.thirdStage.eng2.burnTime)
+        )
+        self.correctionRange = 30000.0  # unit: m
+        self.stopFlight = False
+        self.AOA = 90.0  # unit: degrees
+        self.orbits = {"LEO": 200000.0, "SSO": 700000.0, "GTO": 37000000.0}  # units: m
+        self.orbit = "LEO"  # low-Earth orbit by default
+        self.status = statusFromString(self.evaluateStatus())
+        self.watch()
+
+    def watch(self):
+        stages = [self.firstStage, self.boosters, self.secondStage, self.thirdStage]
+        for stage, bit in zip(stages, STAGEBITS):
+            stage.watchers.append((self, 1 << bit))
+            stage.eng1.watchers.append((self, 1 << (bit + 1)))
+            stage.eng2.watchers.append((self, 1 << (bit + 2)))
+        self.launchEscape.watchers.append((self, 1 << 12))
+        self.fairing.watchers.append((self, 1 << 13))
+
+    def instance(self):
+        # a rocket of its own to fly, as this one is now; only the thrust tables, which
+        # are tuples shared by every engine with the same thrust, are not copied
+        rocket = copyComponent(self)
+        rocket.payload = copyComponent(self.payload)
+        for name in ("firstStage", "boosters", "secondStage", "thirdStage"):
+            stage = copyComponent(getattr(self, name))
+            stage.eng1 = copyComponent(stage.eng1)
+            stage.eng2 = copyComponent(stage.eng2)
+            setattr(rocket, name, stage)
+        rocket.launchEscape = copyComponent(self.launchEscape)
+        rocket.fairing = copyComponent(self.fairing)
+        rocket.watch()
+        return rocket
+
+    def spec(self):
+        # the definition of the rocket as plain data, e.g. for hashing
+        def engine(e):
+            return [e.name, e.burnTime, e.thrustSL, e.thrustV, e.thrustProfile]
+
+        def stage(s):
+            return {
+                "emptyMass": s.emptyMass,
+                "mass": s.mass,
+                "eng1": engine(s.eng1),
+                "eng1Count": s.eng1Count,
+                "eng2": engine(s.eng2),
+                "eng2Count": s.eng2Count,
+                "hotSeparation": s.hotSeparation,
+            }
+
+        return {
+            "name": self.name,
+            "boosters": stage(self.boosters),
+            "firstStage": stage(self.firstStage),
+            "secondStage": stage(self.secondStage),
+            "thirdStage": stage(self.thirdStage),
+            "payload": [self.payload.name, self.payload.mass],
+            "launchEscape": self.launchEscape.mass,
+            "fairing": self.fairing.mass,
+            "diameter": self.diameter,
+            "orbits": self.orbits,
+            "correctionRange": self.correctionRange,
+        }
+
+    def parts(self):
+        # the rocket and every component of it, for flightstate.StateLayout
+        stages = [self.firstStage, self.boosters, self.secondStage, self.thirdStage]
+        engines = [engine for stage in stages for engine in (stage.eng1, stage.eng2)]
+        return [self] + stages + engines + [self.launchEscape, self.fairing]
+
+    def coreStages(self):
+        # the stages that fire one after the other, without the boosters
+        stages = []
+        for stage in (self.firstStage, self.secondStage, self.thirdStage):
+            if stage.eng1Count == 0:
+                break
+            stages.append(stage)
+        return stages
+
+    def canLiftOff(self, mass):
+        # lights the engines of an instance, so this rocket stays as it is
+        rocket = self.instance()
+        return (self.Fg(mass, 0.0)) < (
+            (
+                rocket.firstStage.ignition(tableRow(0))
+                + rocket.boosters.ignition(tableRow(0))
+            )
+            * 1000
+        )
+
+    def evaluateStatus(self):
+        # order of status code: first stage, first stage engines, boosters, booster engines, second stage... launch escape tower, fairing
+        # 0 -> module doesn't exists; 1 -> module exists; 2 -> engine is not running; 3 -> engine is running
+        status = ""
+        if self.firstStage.mass != 0.0:
+            status += "1"
+            if self.firstStage.eng1.fire:
+                status += "3"
+            else:
+                status += "2"
+            if self.firstStage.eng2.fire:
+                status += "3"
+            else:
+                status += "2"
+        else:
+            status += "022"
+        if self.boosters.mass != 0.0:
+            status += "1"
+            if self.boosters.eng1.fire:
+                status += "3"
+            else:
+                status += "2"
+            if self.boosters.eng2.fire:
+                status += "3"
+            else:
+                status += "2"
+        else:
+            status += "022"
+        if self.secondStage.mass != 0.0:
+            status += "1"
+            if self.secondStage.eng1.fire:
+                status += "3"
+            else:
+                status += "2"
+            if self.secondStage.eng2.fire:
+                status += "3"
+            else:
+                status += "2"
+        else:
+            status += "022"
+        if self.thirdStage.mass != 0.0:
+            status += "1"
+            if self.thirdStage.eng1.fire:
+                status += "3"
+            else:
+                status += "2"
+            if self.thirdStage.eng2.fire:
+                status += "3"
+            else:
+                status += "2"
+        else:
+            status += "022"
+        if self.launchEscape.mass != 0.0:
+            status += "1"
+        else:
+            status += "0"
+        if self.fairing.mass != 0.0:
+            status += "1"
+        else:
+            status += "0"
+
+        return status
+
+    def evaluateOutcome(self, alt, vNet):
+        # success/fast/slow: inside the target altitude band; high/low/failed: outside
+        vNet += 460
+        desiredVelocity = math.sqrt(
+            (6.67 * (10**-11) * 5.97219 * (10**24)) / (6378000 + alt)
+        )  # unit: m/s
+        if (
+            alt > self.orbits[self.orbit] - self.correctionRange
+            and alt < self.orbits[self.orbit] + self.correctionRange
+        ):
+            if vNet > desiredVelocity - 480 and vNet < desiredVelocity + 480:
+                return "success"
+            elif vNet >= desiredVelocity + 480:
+                return "fast"
+            else:
+                return "slow"
+        elif alt > self.orbits["LEO"] + self.correctionRange:
+            return "high"
+        elif alt > self.orbits["LEO"] - 7000:
+            return "low"
+        return "failed"
+
+    def evaluateResult(self, alt, vNet, orbit=None):
+        # orbit: the orbit.Orbit the payload was left on, if any
+        outcome = self.evaluateOutcome(alt, vNet)
+        vNet += 460
+        desiredVelocity = math.sqrt(
+            (6.67 * (10**-11) * 5.97219 * (10**24)) / (6378000 + alt)
+        )  # unit: m/s
+        result = [
+            f"Orbital altitude: {(alt / 1000):.4f} km",
+            f"Orbital velocity: {vNet:.4f} m/s",
+        ]
+        if outcome in ("success", "fast", "slow"):
+            result.append(f"Desired velocity: {desiredVelocity:.4f} m/s")
+        else:
+            result.append(f"Desired altitude: {int(self.orbits[self.orbit] / 1000)} km")
+        if orbit is not None and orbit.bound:
+            result.append(
+                f"Apogee: {(orbit.apogee / 1000):.4f} km, "
+                f"perigee: {(orbit.perigee / 1000):.4f} km"
+                + (" (below the surface)" if orbit.perigee < 0 else "")
+            )
+            result.append(f"Orbital period: {(orbit.period / 60):.4f} min")
+        elif orbit is not None:
+            result.append(
+                f"Escape trajectory, perigee: {(orbit.perigee / 1000):.4f} km"
+            )
+        result.append(RESULTMESSAGES[outcome])
+        return result
+
+    def Fg(self, mass, alt):
+        return ((6.67 * (10**-11)) * mass * (5.97219 * (10**24))) / (
+            ((6378000 + alt) * (6378000 + alt))
+        )
+
+    def Fc(self, mass, v, alt):
+        return mass * ((v + 460) ** 2) / (6378000 + alt)
+
+    def rocketMass(self):
+        return (
+            self.boosters.mass
+            + self.firstStage.mass
+            + self.secondStage.mass
+            + self.thirdStage.mass
+            + self.payload.mass
+            + self.launchEscape.mass
+            + self.fairing.mass
+        )
+
+    def aerodynamicForces(self, alt, airspeed, angleOfAttack):
+        # (drag, lift) in N: drag against the direction of flight, lift towards the
+        # side the nose points to; one table position serves every lookup
+        position = alt / TABLESTEP
+        if position >= LASTINDEX:
+            return 0.0, 0.0
+        index = int(position) if position > 0 else 0
+        fraction = position - index if position > 0 else 0.0
+        density = DENSITY[index] + (DENSITY[index + 1] - DENSITY[index]) * fraction
+        speedOfSound = (
+            SPEEDOFSOUND[index]
+            + (SPEEDOFSOUND[index + 1] - SPEEDOFSOUND[index]) * fraction
+        )
+        force = 0.5 * density * airspeed * airspeed * self.referenceArea  # q·A
+        position = airspeed / speedOfSound / MACHSTEP
+        index = int(position)
+        if index >= len(DRAGCOEFFICIENTS) - 1:
+            dragCoefficient = DRAGCOEFFICIENTS[-1]
+        else:
+            dragCoefficient = DRAGCOEFFICIENTS[index] + (
+                DRAGCOEFFICIENTS[index + 1] - DRAGCOEFFICIENTS[index]
+            ) * (position - index)
+        # sin·cos keeps the normal force bounded however far the nose is off
+        liftCoefficient = LIFTSLOPE * 0.5 * math.sin(angleOfAttack * math.pi / 90)
+        return force * dragCoefficient, force * liftCoefficient
+
+    def lift(self, alt, airspeed, angleOfAttack):
+        # unit: N; angleOfAttack in degrees
+        return self.aerodynamicForces(alt, airspeed, angleOfAttack)[1]
+
+    def drag(self, alt, airspeed):
+        # unit: N
+        return self.aerodynamicForces(alt, airspeed, 0.0)[0]
+
+    def findAcceleration(
+        self, thrust, alt, mass, v, aoa=None, xVelocity=0.0, yVelocity=0.0
+    ):
+        # the air acts on the velocity components, the flight path they point along
+        if aoa is None:
+            aoa = self.AOA
+        Nx = math.cos(aoa * math.pi / 180) * thrust * 1000  # units: N
+        Ny = math.sin(aoa * math.pi / 180) * thrust * 1000  # units: N
+        airspeed = math.sqrt(xVelocity * xVelocity + yVelocity * yVelocity)
+        if alt < TOP and airspeed != 0 and self.referenceArea != 0:
+            pathAngle = math.atan2(yVelocity, xVelocity) * 180 / math.pi
+            drag, lift = self.aerodynamicForces(alt, airspeed, aoa - pathAngle)
+            pathCos, pathSin = xVelocity / airspeed, yVelocity / airspeed
+            Nx += -drag * pathCos - lift * pathSin
+            Ny += -drag * pathSin + lift * pathCos
+        Ny = Ny + (-1.0 * self.Fg(mass, alt)) + self.Fc(mass, v, alt)
+        ax = Nx / mass  # units: m/s²
+        ay = Ny / mass  # units: m/s²
+        aNet = math.sqrt(ax * ax + ay * ay)
+        return aNet, ay, ax
+
+    def pitchRate(self):
+        return 90 / (self.totalBurnTime - 7)  # unit: degrees/s
+
+    def pitchProgramAltitudes(self):
+        # altitudes at which the pitch program changes its rate
+        return self.orbits["LEO"] * 0.4, self.orbits["LEO"] - self.correctionRange
+
+    def pitchProgramRate(self, t, alt, aoa, baseRate):
+        steepEnd, shallowEnd = self.pitchProgramAltitudes()
+        if t > 7 and aoa >= 0.5 and alt < steepEnd:
+            return 2 * baseRate
+        elif t > 7 and aoa >= 0.5 and alt > steepEnd and alt < shallowEnd:
+            return baseRate
+        return 0.0
+
+    def executeFlightPath(self, t, alt, baseRate):
+        self.AOA -= self.pitchProgramRate(t, alt, self.AOA, baseRate)
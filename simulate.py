@@ -0,0 +1,60 @@
+import argparse, time
+
+from autopilot import Autopilot
+from flight import Flight, DT
+from integrators import INTEGRATORS
+from library import ROCKETS
+from telemetry import TelemetryRecorder
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fly a rocket without opening a window."
+    )
+    parser.add_argument("rocket", choices=ROCKETS.keys())
+    parser.add_argument(
+        "orbit", nargs="?", default="LEO", choices=["LEO", "SSO", "GTO"]
+    )
+    parser.add_argument(
+        "--dt", type=float, default=DT, help="physics time step in seconds"
+    )
+    parser.add_argument("--integrator", default="euler", choices=INTEGRATORS.keys())
+    parser.add_argument("--record", metavar="PATH", help="save telemetry to PATH")
+    parser.add_argument(
+        "--autopilot", metavar="PATH", help="fly a profile saved by optimize.py"
+    )
+    args = parser.parse_args()
+
+    recorder = None
+    if args.record:
+        recorder = TelemetryRecorder(
+            args.record, {"rocket": ROCKETS[args.rocket].name, "orbit": args.orbit}
+        )
+    autopilot = Autopilot.load(args.autopilot) if args.autopilot else None
+    start = time.perf_counter()
+    flight = Flight(
+        ROCKETS[args.rocket],
+        args.orbit,
+        args.dt,
+        INTEGRATORS[args.integrator](),
+        recorder=recorder,
+        autopilot=autopilot,
+    )
+    result = flight.run()
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+
+    for t, message in flight.events:
+        print(f"T+{t:8.2f} s  {message}")
+    print()
+    for line in result:
+        print(line)
+    print(
+        f"\nSimulated {flight.t:.2f} s of flight in {elapsed * 1000:.1f} ms "
+        f"({flight.evaluations} force evaluations)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# ----------------------------------SPRITE CACHE----------------------------------
+# Loads the status images of a rocket once, already converted to the display format
+# and scaled, and keeps the rotated copies the flight screen asks for in a
+# least-recently-used cache capped by memory, so drawing a model is a dictionary
+# lookup and a blit once its angles have been seen. If bake.py has packed a rocket
+# into an atlas, its pre-rotated sprites are memory-mapped instead of decoding PNGs.
+
+import pygame, os, json, mmap, hashlib
+from collections import OrderedDict
+
+from rocket import statusFromString
+
+MODELSCALE = 0.9
+ANGLESTEP = 0.5  # unit: degrees, rotations are rounded to this
+CACHEBYTES = 48 * 1024 * 1024  # unit: bytes, memory allowed for rotated copies
+
+
+def sourceSignature(path):
+    # changes whenever an image of the folder is added, removed or rewritten
+    digest = hashlib.sha256()
+    for fileName in sorted(os.listdir(path)):
+        if fileName.endswith(".png"):
+            stat = os.stat(os.path.join(path, fileName))
+            digest.update(f"{fileName}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def scaleModel(rawModel, scale):
+    return pygame.transform.scale(
+        rawModel, (rawModel.get_width() * scale, rawModel.get_height() * scale)
+    )
+
+
+def rotateModel(model, angle):
+    # rotated copy cropped to its visible pixels, and where the crop sits inside
+    # the full rotated surface
+    rotated = pygame.transform.rotate(model, angle)
+    rect = rotated.get_bounding_rect()
+    return rotated.subsurface(rect).copy(), rect.topleft
+
+
+class Atlas:
+    def __init__(self, directory, rocketName):
+        with open(os.path.join(directory, rocketName + ".json")) as file:
+            self.index = json.load(file)
+        with open(os.path.join(directory, rocketName + ".atlas"), "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.angleStep = self.index["angleStep"]
+        self.statuses = {
+            statusFromString(status): sprite
+            for status, sprite in self.index["sprites"].items()
+        }
+
+    def surface(self, entry):
+        offset, width, height = entry[:3]
+        return pygame.image.frombuffer(
+            memoryview(self.data)[offset : offset + width * height * 4],
+            (width, height),
+            "RGBA",
+        )
+
+    def models(self):
+        return {
+            statusFromString(status): self.surface(sprite["model"])
+            for status, sprite in self.index["sprites"].items()
+        }
+
+    def rotated(self, status, angle):
+        # the baked sprite nearest to angle, if angle lies in the baked range
+        sprite = self.statuses.get(status)
+        if sprite is None:
+            return None
+        entry = sprite["angles"].get(str(round(angle / self.angleStep)))
+        if entry is None:
+            return None
+        return self.surface(entry), tuple(entry[3:])
+
+
+class SpriteCache:
+    def __init__(
+        self,
+        directory,
+        atlasDirectory=None,
+        scale=MODELSCALE,
+        angleStep=ANGLESTEP,
+        maxBytes=CACHEBYTES,
+    ):
+        self.directory = directory
+        self.atlasDirectory = atlasDirectory
+        self.scale = scale
+        self.angleStep = angleStep
+        self.maxBytes = maxBytes
+        self.models = {}  # rocket name -> {status: scaled surface}
+        self.atlases = {}  # rocket name -> Atlas, or None when not baked
+        # (rocket name, status, angle bucket) -> (surface, offset)
+        self.rotations = OrderedDict()
+        self.bytes = 0
+
+    def loadAtlas(self, rocketName, path):
+        if self.atlasDirectory is None:
+            return None
+        try:
+            atlas = Atlas(self.atlasDirectory, rocketName)
+        except (OSError, ValueError):
+            return None
+        index = atlas.index
+        if index["scale"] != self.scale or index["source"] != sourceSignature(path):
+            return None  # baked from other images, bake.py has to be run again
+        if index.get("size") != len(atlas.data):
+            return None  # the atlas and its index come from different bakes
+        return atlas
+
+    def load(self, rocketName):
+        # every status image of a rocket, loaded on first use of the rocket
+        if rocketName not in self.models:
+            models = {}
+            atlas = None
+            path = os.path.join(self.directory, rocketName)
+            if os.path.isdir(path):
+                atlas = self.loadAtlas(rocketName, path)
+                if atlas is not None:
+                    models = atlas.models()
+                else:
+                    for fileName in sorted(os.listdir(path)):
+                        name, extension = os.path.splitext(fileName)
+                        if extension == ".png":
+                            rawModel = pygame.image.load(os.path.join(path, fileName))
+                            status = statusFromString(name[len(rocketName) + 1 :])
+                            models[status] = scaleModel(
+                                rawModel.convert_alpha(), self.scale
+                            )
+            self.models[rocketName] = models
+            self.atlases[rocketName] = atlas
+        return self.models[rocketName]
+
+    def rotated(self, rocketName, status, angle):
+        # (surface, offset of the surface inside the full rotated model) or None
+        model = self.load(rocketName).get(status)
+        if model is None:
+            return None
+        atlas = self.atlases[rocketName]
+        step = atlas.angleStep if atlas is not None else self.angleStep
+        bucket = round(angle / step)
+        key = (rocketName, status, bucket)
+        sprite = self.rotations.get(key)
+        if sprite is not None:
+            self.rotations.move_to_end(key)
+            return sprite
+        if atlas is not None:
+            sprite = atlas.rotated(status, angle)
+        if sprite is None:
+            sprite = rotateModel(model, bucket * step)
+        sprite = (sprite[0].convert_alpha(), sprite[1])
+        self.rotations[key] = sprite
+        self.bytes += surfaceBytes(sprite[0])
+        while self.bytes > self.maxBytes and len(self.rotations) > 1:
+            _, (evicted, _) = self.rotations.popitem(last=False)
+            self.bytes -= surfaceBytes(evicted)
+        return sprite
+
+    def clear(self):
+        self.rotations.clear()
+        self.bytes = 0
+
+
+def surfaceBytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
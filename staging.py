@@ -0,0 +1,299 @@
+# ----------------------------------STAGING----------------------------------
+# Fires any number of core stages one after the other, with boosters strapped to the
+# first one. Everything that ends or starts a burn is put on a priority queue the
+# moment it becomes known: engine cutoffs when a stage ignites, hot-separation
+# ignition of the next stage, separations once a stage is spent, and fairing or
+# escape-tower jettison by altitude. A tick only burns the running stages and handles
+# the events that are due, however many stages the rocket has. Engines still count
+# down their own burn time, so a due event checks it before acting on it.
+
+import heapq
+
+from atmosphere import tableRow
+
+SEPARATIONDELAY = 1.0  # unit: s
+HOTSEPARATIONLEAD = 2.0  # unit: s
+DUEMARGIN = 1e-6  # unit: s, events this close are checked on the current tick
+STAGENAMES = ("one", "two", "three", "four", "five", "six", "seven", "eight")
+
+# the order in which events due on the same tick are handled
+BOOSTERCUTOFF, SECONDARYCUTOFF, MAINCUTOFF, HOTSEPARATION = range(4)
+
+
+class Staging:
+    __slots__ = (
+        "stages",
+        "boosters",
+        "current",
+        "hotStage",
+        "events",
+        "separations",
+        "jettisons",
+        "jettisonOrder",
+        "jettisonMessages",
+        "sequence",
+        "burning",
+    )
+
+    def __init__(self, stages, boosters=(), jettisons=()):
+        # stages: core stages in firing order; boosters: stages burning with the
+        # first one; jettisons: (altitude, component, message)
+        self.stages = list(stages)
+        self.boosters = list(boosters)
+        self.current = 0  # index of the core stage that is firing
+        self.hotStage = None  # next stage, while it is ignited by hot separation
+        self.events = []  # (time, (stage, kind), sequence, stage, kind)
+        self.separations = []  # (time, sequence, stage, name)
+        self.jettisons = []  # (altitude, sequence, component, message)
+        self.jettisonOrder = [component for _, component, _ in jettisons]
+        self.jettisonMessages = [message for _, _, message in jettisons]
+        self.sequence = 0  # ties on the queues go to whatever was queued first
+        self.burning = []  # (engine, thrust factor, seconds burned) of the last tick
+        for altitude, component, message in jettisons:
+            heapq.heappush(
+                self.jettisons, (altitude, self.ticket(), component, message)
+            )
+
+    def ticket(self):
+        self.sequence += 1
+        return self.sequence
+
+    def name(self, index):
+        if index < len(STAGENAMES):
+            return "Stage " + STAGENAMES[index]
+        return f"Stage {index + 1}"
+
+    def schedule(self, time, index, kind):
+        # index -1 is the booster group
+        heapq.heappush(self.events, (time, (index, kind), self.ticket(), index, kind))
+
+    def start(self, t):
+        for booster in self.boosters:
+            booster.fireStage = True
+            self.schedule(
+                t + max(booster.eng1.burnTime, booster.eng2.burnTime),
+                -1,
+                BOOSTERCUTOFF,
+            )
+        if self.stages:
+            self.ignite(0, t)
+
+    def ignite(self, index, t):
+        stage = self.stages[index]
+        stage.fireStage = True
+        if stage.eng2Count != 0 and stage.eng2.burnTime != -1:
+            self.schedule(t + stage.eng2.burnTime, index, SECONDARYCUTOFF)
+        if stage.eng1.burnTime != -1:
+            self.schedule(t + stage.eng1.burnTime, index, MAINCUTOFF)
+        if stage.hotSeparation and index + 1 < len(self.stages):
+            self.schedule(
+                t + stage.eng1.burnTime - HOTSEPARATIONLEAD, index, HOTSEPARATION
+            )
+
+    def burnedOut(self):
+        return self.current >= len(self.stages)
+
+    def timeToNextEvent(self, t):
+        times = [queue[0][0] - t for queue in (self.events, self.separations) if queue]
+        return min(times, default=float("inf"))
+
+    def nextJettisonAltitude(self):
+        for altitude, _, component, _ in sorted(self.jettisons):
+            if component.mass != 0:
+                return altitude
+        return None
+
+    def separate(self, t, log):
+        while self.separations and self.separations[0][0] <= t + 1e-9:
+            _, _, stage, name = heapq.heappop(self.separations)
+            stage.separate()
+            stage.readySeparate = False
+            log(f"{name} separation")
+
+    def jettison(self, altitude, log):
+        while self.jettisons and self.jettisons[0][0] <= altitude:
+            _, _, component, message = heapq.heappop(self.jettisons)
+            if component.mass != 0:
+                component.separate()
+                log(message)
+
+    def burn(self, altitude, dt, thrustMultiplier):
+        # thrust (kN) and mass flow (kg/s) of everything running this tick
+        self.burning = []
+        if self.burnedOut():
+            return 0.0, 0.0
+        stage = self.stages[self.current]
+        row = tableRow(altitude)  # shared by the thrust of every engine
+        self.watch(stage, thrustMultiplier)
+        thrust = stage.ignition(row, dt)
+        massFlow = stage.burn(dt)
+        if self.current == 0:
+            for booster in self.boosters:
+                if booster.fireStage:
+                    self.watch(booster, thrustMultiplier)
+                    thrust += booster.ignition(row, dt)
+                    massFlow += booster.burn(dt)
+        thrust *= thrustMultiplier
+        if self.hotStage is not None:
+            self.watch(self.hotStage, 1.0)
+            thrust += self.hotStage.ignition(row, dt)
+            massFlow += self.hotStage.burn(dt)
+        return thrust, massFlow
+
+    def watch(self, stage, thrustMultiplier):
+        # remembers the engines of stage before burn() runs them, for thrust()
+        for engine, count in stage.engines():
+            self.burning.append(
+                (
+                    engine,
+                    count * thrustMultiplier,
+                    engine.ratedBurnTime - engine.burnTime,
+                )
+            )
+
+    def thrust(self, altitude, elapsed):
+        # thrust (kN) of the engines the last burn() ran, elapsed seconds into its
+        # tick and at another altitude, so an integrator can sample it within a step
+        row = tableRow(altitude)
+        return sum(
+            factor * engine.thrust(row, burned + elapsed)
+            for engine, factor, burned in self.burning
+        )
+
+    def update(self, t, log):
+        due = []
+        while self.events and self.events[0][0] <= t + DUEMARGIN:
+            due.append(heapq.heappop(self.events))
+        due.sort(key=lambda event: event[1])
+        for _, _, _, index, kind in due:
+            if index == -1:
+                self.cutBoosters(t, log)
+            elif index == self.current:
+                if kind == HOTSEPARATION:
+                    self.hotSeparate(t, log)
+                else:
+                    self.cutEngine(index, kind, t, log)
+
+    def cutBoosters(self, t, log):
+        if self.current != 0:
+            return
+        for booster in self.boosters:
+            if not booster.fireStage:
+                continue
+            burnTime = max(booster.eng1.burnTime, booster.eng2.burnTime)
+            if burnTime > 0:
+                self.schedule(t + burnTime, -1, BOOSTERCUTOFF)
+            elif burnTime > -1.0:
+                booster.eng1.shutDown()
+                booster.eng2.shutDown()
+                booster.eng1FuelConsumption = 0
+                booster.eng2FuelConsumption = 0
+                booster.fireStage = False
+                self.readySeparate(booster, "Boosters", t)
+                log("Boosters shut down")
+
+    def cutEngine(self, index, kind, t, log):
+        stage = self.stages[index]
+        engine = stage.eng1 if kind == MAINCUTOFF else stage.eng2
+        if engine.burnTime > 0:
+            self.schedule(t + engine.burnTime, index, kind)
+            return
+        if engine.burnTime <= -1.0:
+            return
+        engine.shutDown()
+        if kind == MAINCUTOFF:
+            stage.eng1FuelConsumption = 0
+            log(f"{self.name(index)} main engine shut down")
+        else:
+            stage.eng2FuelConsumption = 0
+            log(f"{self.name(index)} secondary engine shut down")
+        if stage.eng1.burnTime == -1 and (
+            stage.eng2Count == 0 or stage.eng2.burnTime == -1
+        ):
+            self.handOver(t, log)
+
+    def hotSeparate(self, t, log):
+        stage = self.stages[self.current]
+        if stage.eng1.burnTime > HOTSEPARATIONLEAD:
+            self.schedule(
+                t + stage.eng1.burnTime - HOTSEPARATIONLEAD,
+                self.current,
+                HOTSEPARATION,
+            )
+            return
+        log(f"{self.name(self.current + 1)} ignition")
+        stage.runHotSeparation = True
+        self.hotStage = self.stages[self.current + 1]
+
+    def readySeparate(self, stage, name, t):
+        stage.readySeparate = True
+        heapq.heappush(
+            self.separations, (t + SEPARATIONDELAY, self.ticket(), stage, name)
+        )
+
+    def handOver(self, t, log):
+        # the firing stage is spent: drop it and light the next one
+        stage = self.stages[self.current]
+        stage.fireStage = False
+        self.readySeparate(stage, self.name(self.current), t)
+        self.current += 1
+        self.hotStage = None
+        if not self.burnedOut():
+            if not stage.hotSeparation:
+                log(f"{self.name(self.current)} ignition")
+            self.ignite(self.current, t)
+
+    def state(self):
+        # everything that changes while flying, as numbers: the firing stage, the
+        # ticket counter and each queue in heap order, components by their position
+        components = self.stages + self.boosters
+        values = [
+            self.current,
+            -1 if self.hotStage is None else self.stages.index(self.hotStage),
+            self.sequence,
+            len(self.events),
+            len(self.separations),
+            len(self.jettisons),
+        ]
+        for time, _, sequence, index, kind in self.events:
+            values += (time, sequence, index, kind)
+        for time, sequence, stage, _ in self.separations:
+            values += (time, sequence, components.index(stage))
+        for altitude, sequence, component, _ in self.jettisons:
+            values += (altitude, sequence, self.jettisonOrder.index(component))
+        return values
+
+    def restore(self, values):
+        # values: what state() returned, as floats
+        components = self.stages + self.boosters
+        self.current, hotStage, self.sequence = map(int, values[:3])
+        self.hotStage = None if hotStage == -1 else self.stages[hotStage]
+        counts = [int(count) for count in values[3:6]]
+        position = 6
+        self.events = []
+        for _ in range(counts[0]):
+            time, sequence, index, kind = values[position : position + 4]
+            index, kind = int(index), int(kind)
+            self.events.append((time, (index, kind), int(sequence), index, kind))
+            position += 4
+        self.separations = []
+        for _ in range(counts[1]):
+            time, sequence, which = values[position : position + 3]
+            which = int(which)
+            name = self.name(which) if which < len(self.stages) else "Boosters"
+            self.separations.append((time, int(sequence), components[which], name))
+            position += 3
+        self.jettisons = []
+        for _ in range(counts[2]):
+            altitude, sequence, which = values[position : position + 3]
+            which = int(which)
+            self.jettisons.append(
+                (
+                    altitude,
+                    int(sequence),
+                    self.jettisonOrder[which],
+                    self.jettisonMessages[which],
+                )
+            )
+            position += 3
+        return position
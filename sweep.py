@@ -0,0 +1,140 @@
+# ----------------------------------PARAMETER SWEEP----------------------------------
+# Flies every combination of rocket, target orbit, thrust multiplier and pitch-rate
+# multiplier in a pool of worker processes and scores each one with
+# Rocket.evaluateOutcome(). Finished cells are stored on disk under a key hashed from
+# the rocket definition and the flight settings, so re-running a sweep only flies the
+# cells whose inputs changed.
+
+import argparse, hashlib, itertools, json, os, time
+from multiprocessing import Pool
+
+from flight import Flight, DT
+from integrators import INTEGRATORS
+from library import ROCKETS
+
+CACHEDIR = os.path.join(".cache", "sweep")
+CACHEVERSION = 6  # bump when the physics change so stale results are not reused
+
+
+def cellKey(cell):
+    rocketName, orbit, thrust, pitch, integrator, dt = cell
+    definition = {
+        "version": CACHEVERSION,
+        "rocket": ROCKETS[rocketName].spec(),
+        "orbit": orbit,
+        "thrustMultiplier": thrust,
+        "pitchRateMultiplier": pitch,
+        "integrator": integrator,
+        "dt": dt,
+    }
+    encoded = json.dumps(definition, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def flyCell(cell):
+    rocketName, orbit, thrust, pitch, integrator, dt = cell
+    flight = Flight(
+        ROCKETS[rocketName], orbit, dt, INTEGRATORS[integrator](), thrust, pitch
+    )
+    flight.run()
+    return {
+        "rocket": rocketName,
+        "orbit": orbit,
+        "thrustMultiplier": thrust,
+        "pitchRateMultiplier": pitch,
+        "altitude": flight.altitude,
+        "velocity": flight.velocity,
+        "outcome": flight.rocket.evaluateOutcome(flight.altitude, flight.velocity),
+    }
+
+
+def loadCached(cacheDir, key):
+    try:
+        with open(os.path.join(cacheDir, key + ".json")) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def storeCached(cacheDir, key, result):
+    # write to a temporary file first so an interrupted sweep never leaves half a file;
+    # one per process, as sweeps running side by side may store the same cell
+    path = os.path.join(cacheDir, key + ".json")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(result, file)
+    os.replace(temporary, path)
+
+
+def sweep(cells, cacheDir=CACHEDIR, workers=None):
+    os.makedirs(cacheDir, exist_ok=True)
+    keys = [cellKey(cell) for cell in cells]
+    results = [loadCached(cacheDir, key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        with Pool(workers) as pool:
+            flown = pool.imap(flyCell, [cells[i] for i in missing])
+            for i, result in zip(missing, flown):
+                storeCached(cacheDir, keys[i], result)
+                results[i] = result
+    return results, len(cells) - len(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fly a grid of rocket variants in parallel and score them."
+    )
+    parser.add_argument(
+        "--rockets", nargs="+", default=list(ROCKETS), choices=ROCKETS.keys()
+    )
+    parser.add_argument(
+        "--orbits",
+        nargs="+",
+        default=["LEO", "SSO", "GTO"],
+        choices=["LEO", "SSO", "GTO"],
+    )
+    parser.add_argument("--thrust", nargs="+", type=float, default=[0.7, 0.85, 1.0])
+    parser.add_argument("--pitch", nargs="+", type=float, default=[0.8, 1.0, 1.2])
+    parser.add_argument("--integrator", default="rk45", choices=INTEGRATORS.keys())
+    parser.add_argument(
+        "--dt", type=float, default=DT, help="physics time step in seconds"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    parser.add_argument("--cache-dir", default=CACHEDIR)
+    args = parser.parse_args()
+
+    cells = list(
+        itertools.product(
+            args.rockets,
+            args.orbits,
+            args.thrust,
+            args.pitch,
+            [args.integrator],
+            [args.dt],
+        )
+    )
+    start = time.perf_counter()
+    results, hits = sweep(cells, args.cache_dir, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{'rocket':<10}{'orbit':<6}{'thrust':>8}{'pitch':>7}"
+        f"{'altitude km':>14}{'velocity m/s':>14}  outcome"
+    )
+    for result in results:
+        print(
+            f"{result['rocket']:<10}{result['orbit']:<6}"
+            f"{result['thrustMultiplier']:>8.2f}{result['pitchRateMultiplier']:>7.2f}"
+            f"{result['altitude'] / 1000:>14.2f}{result['velocity'] + 460:>14.1f}"
+            f"  {result['outcome']}"
+        )
+    print(
+        f"\n{len(cells)} cells in {elapsed:.2f} s "
+        f"({hits} from cache, {len(cells) - hits} flown)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# ----------------------------------TELEMETRY----------------------------------
+# Records every physics step of a flight as one fixed-size binary record. Records are
+# packed into a preallocated chunk and copied into a memory-mapped file whenever the
+# chunk fills up, so a long flight costs a struct.pack_into() per step and a few
+# hundred kilobytes of memory however long it runs. Staging events go to a small JSON
+# sidecar next to the recording, pointing at the record they happened on.
+
+import json, mmap, struct
+
+import numpy as np
+
+MAGIC = b"RKTM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")  # magic, version, record size, record count
+# t, mass, AOA, aNet, ax, ay, vNet, vx, vy, altitude, thrust, throttle, status
+RECORD = struct.Struct("<d8fd2fH")
+RECORDTYPE = np.dtype(
+    [
+        ("t", "<f8"),  # unit: s
+        ("mass", "<f4"),  # unit: kg
+        ("aoa", "<f4"),  # unit: degrees
+        ("aNet", "<f4"),  # unit: m/s²
+        ("ax", "<f4"),
+        ("ay", "<f4"),
+        ("vNet", "<f4"),  # unit: m/s
+        ("vx", "<f4"),
+        ("vy", "<f4"),
+        ("altitude", "<f8"),  # unit: m
+        ("thrust", "<f4"),  # unit: kN
+        ("throttle", "<f4"),
+        ("status", "<u2"),  # Rocket.status
+    ]
+)
+CHUNKRECORDS = 4096
+GROWRECORDS = 16 * CHUNKRECORDS  # the file grows by this many records at a time
+
+
+def eventsPath(path):
+    return path + ".events.json"
+
+
+class TelemetryRecorder:
+    def __init__(self, path, info=None, chunkRecords=CHUNKRECORDS):
+        self.path = path
+        self.info = info if info is not None else {}  # e.g. rocket and orbit
+        self.file = open(path, "w+b")
+        self.chunk = bytearray(RECORD.size * chunkRecords)
+        self.chunkRecords = chunkRecords
+        self.used = 0  # records waiting in the chunk
+        self.count = 0  # records in the file
+        self.capacity = 0  # records the file has room for
+        self.map = None
+        self.events = []  # (record index, time, message)
+        self.grow(GROWRECORDS)
+
+    def grow(self, records):
+        if self.map is not None:
+            self.map.close()
+        self.capacity += records
+        self.file.truncate(HEADER.size + self.capacity * RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.map[: HEADER.size] = HEADER.pack(MAGIC, VERSION, RECORD.size, self.count)
+
+    def record(self, flight):
+        acceleration = flight.acceleration
+        RECORD.pack_into(
+            self.chunk,
+            self.used * RECORD.size,
+            flight.t,
+            flight.mass,
+            flight.rocket.AOA,
+            acceleration[0],
+            acceleration[2],
+            acceleration[1],
+            flight.velocity,
+            flight.xVelocity,
+            flight.yVelocity,
+            flight.altitude,
+            flight.thrust,
+            flight.thrustMultiplier,
+            flight.rocket.status,
+        )
+        self.used += 1
+        if self.used == self.chunkRecords:
+            self.flush()
+
+    def event(self, t, message):
+        # points at the record of the step the event happened on
+        self.events.append((self.count + self.used, t, message))
+
+    def records(self):
+        return self.count + self.used
+
+    def truncate(self, records):
+        # keeps the first records records and their events, e.g. after a rewind
+        self.flush()
+        self.count = min(records, self.count)
+        self.map[: HEADER.size] = HEADER.pack(MAGIC, VERSION, RECORD.size, self.count)
+        self.events = [event for event in self.events if event[0] < self.count]
+
+    def flush(self):
+        if self.count + self.used > self.capacity:
+            self.grow(max(GROWRECORDS, self.used))
+        start = HEADER.size + self.count * RECORD.size
+        self.map[start : start + self.used * RECORD.size] = self.chunk[
+            : self.used * RECORD.size
+        ]
+        self.count += self.used
+        self.used = 0
+        self.map[: HEADER.size] = HEADER.pack(MAGIC, VERSION, RECORD.size, self.count)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.map.close()
+        self.file.truncate(HEADER.size + self.count * RECORD.size)
+        self.file.close()
+        with open(eventsPath(self.path), "w") as file:
+            json.dump({"info": self.info, "events": self.events}, file)
+
+
+class TelemetryFile:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            magic, version, recordSize, count = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or recordSize != RECORDTYPE.itemsize:
+            raise ValueError(f"{path} is not a version {VERSION} telemetry recording")
+        if count == 0:
+            self.records = np.zeros(0, RECORDTYPE)
+        else:
+            self.records = np.memmap(
+                path, RECORDTYPE, "r", offset=HEADER.size, shape=(count,)
+            )
+        try:
+            with open(eventsPath(path)) as file:
+                sidecar = json.load(file)
+        except FileNotFoundError:
+            sidecar = {"info": {}, "events": []}  # the recording was cut short
+        self.info = sidecar["info"]
+        self.events = [tuple(event) for event in sidecar["events"]]
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,29 @@
+import copy, json, os, sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from library import compileRocket
+
+
+@pytest.fixture
+def threeStageRocket():
+    # Soyuz 2.1a with a hot-separated second stage and an upper stage on top of it
+    with open(os.path.join(ROOT, "Library", "Soyuz21a.json")) as file:
+        definition = json.load(file)
+    definition = copy.deepcopy(definition)
+    definition["name"] = "Soyuz 2.1b"
+    definition["engines"]["S5.92"] = {
+        "burnTime": 180,
+        "thrustSL": 10.0,
+        "thrustV": 19.6,
+    }
+    definition["stages"]["second"]["hotSeparation"] = True
+    definition["stages"]["third"] = {
+        "emptyMass": 1000,
+        "grossMass": 6400,
+        "engines": [["S5.92", 1]],
+    }
+    return compileRocket(definition, "Soyuz 2.1b")
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from batch import BatchFlight
+from flight import Flight
+from library import ROCKETS
+
+
+def stagingEvents(events):
+    # jettisons happen at an altitude, so a batch only logs the ones every flight shares
+    return [(t, message) for t, message in events if "jettisoned" not in message]
+
+
+def assertSameFlight(flight, batch, index=0):
+    assert batch.t == pytest.approx(flight.t, abs=1e-9)
+    assert batch.altitude[index] == pytest.approx(flight.altitude, rel=1e-9)
+    assert batch.velocity[index] == pytest.approx(flight.velocity, rel=1e-9)
+    assert batch.xVelocity[index] == pytest.approx(flight.xVelocity, rel=1e-9)
+    assert batch.aoa[index] == pytest.approx(flight.rocket.AOA, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("key", ["Soyuz21a", "CZ5B", "CZ5C", "Brick"])
+def testMatchesFlight(key):
+    flight = Flight(ROCKETS[key])
+    flight.run()
+    batch = BatchFlight(ROCKETS[key]).run()
+    assertSameFlight(flight, batch)
+    assert batch.events == stagingEvents(flight.events)
+
+
+def testVariantsMatchTheirOwnFlights():
+    multipliers = [0.8, 0.9, 1.0]
+    batch = BatchFlight(
+        ROCKETS["Soyuz21a"], count=3, thrustMultiplier=multipliers, payloadMass=9000
+    ).run()
+    for index, multiplier in enumerate(multipliers):
+        rocket = ROCKETS["Soyuz21a"].instance()
+        rocket.payload = type(rocket.payload)(rocket.payload.name, 9000)
+        flight = Flight(rocket, thrustMultiplier=multiplier)
+        flight.run()
+        assertSameFlight(flight, batch, index)
+
+
+def testGroundedVariantLeavesTheOthersAlone():
+    # too weak to lift off, so it drops out of the batch after its first step
+    multipliers = [1.0, 0.3, 0.95]
+    batch = BatchFlight(
+        ROCKETS["Soyuz21a"], count=3, thrustMultiplier=multipliers
+    ).run()
+    for index, multiplier in enumerate(multipliers):
+        flight = Flight(ROCKETS["Soyuz21a"], thrustMultiplier=multiplier)
+        flight.run()
+        assertSameFlight(flight, batch, index)
+    assert batch.altitude[1] < 0
+    assert batch.coasting.tolist() == [True, False, True]
+
+
+def testThreeStagesFinish(threeStageRocket):
+    flight = Flight(threeStageRocket)
+    flight.run()
+    batch = BatchFlight(threeStageRocket, count=2).run()
+    assert batch.finished.all()
+    assertSameFlight(flight, batch, 1)
+    assert batch.events == stagingEvents(flight.events)
+    assert "Stage three ignition" in [message for _, message in batch.events]
+
+
+def testRunGivesUp():
+    batch = BatchFlight(ROCKETS["Soyuz21a"], count=2)
+    with pytest.raises(RuntimeError):
+        batch.run(maxTime=10.0)
+    assert not batch.finished.any()
@@ -0,0 +1,88 @@
+import pickle
+
+import pytest
+
+from flight import Flight
+from integrators import Euler, RK4, RK45
+from library import ROCKETS
+
+INTEGRATORS = {"Euler": Euler, "RK4": RK4, "RK45": RK45}
+
+
+def trace(flight, until=None):
+    # every state the flight passes through until it finishes, or until time until, as
+    # bytes so the NaNs of a flight that is not coasting compare equal
+    states = []
+    while not flight.finished and (until is None or flight.t < until):
+        flight.step(pitchUp=flight.t > 60.0, dt=flight.nextStep())
+        states.append(flight.snapshot().tobytes())
+    return states
+
+
+def flyTo(flight, t):
+    trace(flight, until=t)
+    return flight
+
+
+@pytest.mark.parametrize("integrator", INTEGRATORS)
+@pytest.mark.parametrize("key", ["Soyuz21a", "CZ5B", "CZ5C", "Brick"])
+def testRestoreRepeatsTheFlight(key, integrator):
+    flight = flyTo(Flight(ROCKETS[key], integrator=INTEGRATORS[integrator]()), 100.0)
+    snapshot = flight.snapshot()
+    first = trace(flight)
+    events = list(flight.events)
+    flight.restore(snapshot)
+    assert flight.snapshot().tobytes() == snapshot.tobytes()
+    assert trace(flight) == first
+    assert flight.events == events
+
+
+def testRestoreAcrossStagingAndCoast(threeStageRocket):
+    flight = Flight(threeStageRocket)
+    early = flyTo(flight, 50.0).snapshot()
+    first = trace(flight)
+    assert flight.coast is not None
+    assert "Stage three ignition" in [message for _, message in flight.events]
+    flight.restore(early)
+    assert flight.coast is None and flight.staging.current == 0
+    assert trace(flight) == first
+
+
+def testRestoreDuringCoast():
+    flight = Flight(ROCKETS["Soyuz21a"])
+    while flight.coast is None:
+        flight.step()
+    flight.step()
+    assert flight.xVelocity == flight.velocity  # the orbit gives both
+    snapshot = flight.snapshot()
+    first = trace(flight)
+    flight.restore(snapshot)
+    assert flight.coast is not None
+    assert trace(flight) == first
+
+
+def testCloneAndPickleFlyOnTheirOwn():
+    flight = flyTo(Flight(ROCKETS["Soyuz21a"]), 150.0)
+    copies = [flight.clone(), pickle.loads(pickle.dumps(flight))]
+    for other in copies:
+        assert other.rocket is not flight.rocket
+        assert other.snapshot().tobytes() == flight.snapshot().tobytes()
+    first = trace(flight)
+    for other in copies:
+        assert trace(other) == first
+        assert other.events == flight.events
+
+
+def testSnapshotIsSmall():
+    flight = flyTo(Flight(ROCKETS["Soyuz21a"]), 10.0)
+    snapshot = flight.snapshot()
+    assert snapshot.itemsize * len(snapshot) < 1024
+
+
+def testInstanceSharesNothingMutable():
+    rocket = ROCKETS["Soyuz21a"]
+    other = rocket.instance()
+    other.orbits["LEO"] += 1000.0
+    other.payload.mass += 1000.0
+    assert other.orbits["LEO"] == rocket.orbits["LEO"] + 1000.0
+    assert other.payload.mass == rocket.payload.mass + 1000.0
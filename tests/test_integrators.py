@@ -0,0 +1,16 @@
+import pytest
+
+from flight import Flight
+from integrators import Euler, RK45
+from library import ROCKETS
+
+
+@pytest.mark.parametrize("key", ["Soyuz21a", "CZ5B"])
+def testRK45MatchesAFineEulerFlight(key):
+    # RK45 takes steps of up to 5 s while the thrust changes with the altitude
+    reference = Flight(ROCKETS[key], integrator=Euler(), dt=0.005)
+    reference.run()
+    flight = Flight(ROCKETS[key], integrator=RK45())
+    flight.run()
+    assert flight.altitude == pytest.approx(reference.altitude, rel=0.01)
+    assert flight.velocity == pytest.approx(reference.velocity, rel=0.01)
@@ -0,0 +1,14 @@
+import os
+import pickle
+
+from library import LIBRARYPATH, loadRocket
+
+
+def testStalePickleIsCompiledAgain(tmp_path):
+    path = os.path.join(LIBRARYPATH, "Soyuz21a.json")
+    rocket = loadRocket(path, str(tmp_path))
+    (compiled,) = tmp_path.glob("*.pickle")
+    # a pickle naming a class that is no longer in rocket.py
+    compiled.write_bytes(b"crocket\nRenamed\n.")
+    assert loadRocket(path, str(tmp_path)).name == rocket.name
+    assert pickle.loads(compiled.read_bytes()).name == rocket.name
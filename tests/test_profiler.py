@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from profiler import FrameProfiler, INPUT, PHYSICS, FLIP
+
+
+def frame(profiler, frameTime=16.0):
+    # a frame of the main loop, with the toggle key pressed while handling input
+    profiler.begin(frameTime)
+    profiler.mark(INPUT)
+    profiler.mark(PHYSICS)
+    profiler.mark(FLIP)
+    profiler.end()
+
+
+def testHiddenRecordsNothing():
+    profiler = FrameProfiler(60)
+    frame(profiler)
+    assert profiler.frames == 0
+    assert not profiler.times.any()
+
+
+def testToggleMidFrameStartsWithNextFrame():
+    profiler = FrameProfiler(60)
+    profiler.begin(16.0)
+    profiler.toggle()
+    profiler.mark(INPUT)
+    profiler.mark(PHYSICS)
+    profiler.end()
+    assert profiler.frames == 0
+    assert not profiler.times.any()
+    frame(profiler)
+    assert profiler.frames == 1
+    assert 0.0 <= profiler.times[0].sum() < 100.0
+
+
+def testShownAgainDoesNotTimeTheHiddenStretch():
+    profiler = FrameProfiler(60)
+    profiler.toggle()
+    frame(profiler)
+    profiler.toggle()
+    time.sleep(0.2)
+    profiler.begin(16.0)
+    profiler.toggle()
+    profiler.mark(INPUT)
+    profiler.end()
+    frame(profiler)
+    assert profiler.frames == 1
+    assert profiler.times[0].sum() < 100.0
+
+
+@pytest.mark.parametrize("frameTime, missed", [(16.0, 0), (40.0, 1)])
+def testMissedDeadlines(frameTime, missed):
+    profiler = FrameProfiler(60)
+    profiler.toggle()
+    frame(profiler, frameTime)
+    assert profiler.missed == missed
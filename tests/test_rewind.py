@@ -0,0 +1,80 @@
+import sys
+
+import numpy as np
+
+from flight import Flight
+from library import ROCKETS
+from rewind import Rewind
+from telemetry import TelemetryFile, TelemetryRecorder
+
+
+def fly(flight, rewind, until, snapshots=None):
+    # steps the flight as the flight screen does, one snapshot offer per step
+    while not flight.finished and flight.t < until:
+        flight.step(pitchUp=flight.t > 60.0)
+        rewind.record(flight)
+        if snapshots is not None:
+            snapshots[flight.t] = flight.snapshot().tobytes()
+
+
+def usedBytes(rewind):
+    # what Rewind.used should be, counted again from scratch
+    used = 0
+    for keyframe, entries in rewind.groups:
+        used += sys.getsizeof(keyframe)
+        for _, _, positions, values in entries:
+            if positions is not None:
+                used += rewind.entrySize(positions, values)
+    return used
+
+
+def testNothingToGoBackTo():
+    flight = Flight(ROCKETS["Soyuz21a"])
+    assert Rewind().back(flight, 5.0) is None
+    assert flight.t == 0.0
+
+
+def testBackRestoresTheFlight():
+    flight = Flight(ROCKETS["Soyuz21a"])
+    rewind = Rewind()
+    snapshots = {}
+    fly(flight, rewind, 200.0, snapshots)
+    for _ in range(3):
+        now = flight.t
+        t = rewind.back(flight, 5.0)
+        assert now - 5.0 - rewind.interval <= t <= now - 5.0
+        assert flight.t == t
+        assert flight.snapshot().tobytes() == snapshots[t]
+        assert all(time <= t for time, _ in flight.events)
+    # and the flight goes on exactly as it did the first time
+    after = {}
+    fly(flight, rewind, 300.0, after)
+    assert all(snapshots.get(t, data) == data for t, data in after.items())
+
+
+def testBackTruncatesTheRecording(tmp_path):
+    path = str(tmp_path / "flight.tlm")
+    recorder = TelemetryRecorder(path, chunkRecords=64)
+    flight = Flight(ROCKETS["Soyuz21a"], recorder=recorder)
+    rewind = Rewind()
+    fly(flight, rewind, 120.0)
+    t = rewind.back(flight, 30.0)
+    assert recorder.records() == round(t / flight.dt) + 1
+    fly(flight, rewind, 150.0)
+    recorder.close()
+    times = TelemetryFile(path).records["t"]
+    assert np.all(np.diff(times) > 0)
+    assert times[-1] == flight.t
+
+
+def testMemoryStaysUnderTheCap():
+    flight = Flight(ROCKETS["Soyuz21a"])
+    rewind = Rewind(memory=16 * 1024, keyframeInterval=8)
+    fly(flight, rewind, float("inf"))
+    assert rewind.used == usedBytes(rewind)
+    assert rewind.used <= rewind.memory
+    oldest = rewind.groups[0][1][0][0]
+    assert oldest > 0.0  # the start of the flight was dropped
+    # going back further than the buffer reaches stops at its oldest snapshot
+    assert rewind.back(flight, flight.t) == oldest
+    assert rewind.used == usedBytes(rewind)
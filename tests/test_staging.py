@@ -0,0 +1,70 @@
+import pytest
+
+from flight import DT
+from staging import Staging, HOTSEPARATIONLEAD, SEPARATIONDELAY
+
+
+def fly(staging, until=None):
+    # runs the staging on its own at sea level, as Flight.step() would, and returns
+    # what it logged
+    events = []
+    t = 0.0
+    while not staging.burnedOut() or staging.separations:
+        if until is not None and t >= until:
+            break
+        t += DT
+        log = lambda message: events.append((t, message))
+        staging.separate(t, log)
+        staging.burn(0.0, DT, 1.0)
+        staging.update(t, log)
+        assert t < 2000.0, "staging never burned out"
+    return events
+
+
+def startStaging(rocket):
+    rocket = rocket.instance()
+    boosters = [rocket.boosters] if rocket.boosters.eng1Count != 0 else []
+    staging = Staging(rocket.coreStages(), boosters)
+    staging.start(0.0)
+    return staging
+
+
+def testThreeStagesFireInOrder(threeStageRocket):
+    staging = startStaging(threeStageRocket)
+    assert len(staging.stages) == 3
+    events = fly(staging)
+    times = dict((message, t) for t, message in events)
+    assert [message for _, message in events] == [
+        "Boosters shut down",
+        "Boosters separation",
+        "Stage two ignition",
+        "Stage one main engine shut down",
+        "Stage one separation",
+        "Stage three ignition",
+        "Stage two main engine shut down",
+        "Stage two separation",
+        "Stage three main engine shut down",
+        "Stage three separation",
+    ]
+    assert staging.hotStage is None
+    assert not any(stage.fireStage for stage in staging.stages)
+    # both lower stages are hot-separated, so the next one lights before cutoff
+    for stage, following in (("one", "two"), ("two", "three")):
+        assert times[f"Stage {following} ignition"] == pytest.approx(
+            times[f"Stage {stage} main engine shut down"] - HOTSEPARATIONLEAD, abs=DT
+        )
+        assert times[f"Stage {stage} separation"] == pytest.approx(
+            times[f"Stage {stage} main engine shut down"] + SEPARATIONDELAY
+        )
+
+
+def testStateRoundTrip(threeStageRocket):
+    # stopped while the second stage still burns and the third is already lit
+    staging = startStaging(threeStageRocket)
+    fly(staging, until=522.0)
+    assert staging.current == 1 and staging.hotStage is staging.stages[2]
+    values = [float(value) for value in staging.state()]
+    other = startStaging(threeStageRocket)
+    assert other.restore(values) == len(values)
+    assert other.state() == staging.state()
+    assert other.hotStage is other.stages[2]
@@ -0,0 +1,69 @@
+# ----------------------------------TEXT CACHE----------------------------------
+# Text that never changes is rendered once, and a changing field is only rendered
+# again when its formatted text actually differs from the one on screen. Changed
+# fields are rendered as a whole: one render call for a short string is cheaper
+# than blitting it together from cached per-character glyphs. systemFont() resolves a
+# system font once and remembers the file it found in .cache, so later starts open
+# the file straight away instead of scanning the installed fonts (fc-list on Linux).
+
+import json, os
+
+import pygame
+
+FONTCACHE = os.path.join(".cache", "fonts.json")
+RESOLVEDFONTS = {}  # "name;bold;italic" -> [file or None, fake bold, fake italic]
+
+
+def systemFont(name, size, bold=False, italic=False, cachePath=FONTCACHE):
+    # the same font pygame.font.SysFont() gives
+    if not RESOLVEDFONTS:
+        try:
+            with open(cachePath) as file:
+                RESOLVEDFONTS.update(json.load(file))
+        except (OSError, ValueError):
+            pass
+    key = f"{name};{int(bold)};{int(italic)}"
+    resolved = RESOLVEDFONTS.get(key)
+    if resolved is None or (
+        resolved[0] is not None and not os.path.exists(resolved[0])
+    ):
+
+        def remember(path, size, fakeBold, fakeItalic):
+            RESOLVEDFONTS[key] = [path, fakeBold, fakeItalic]
+
+        pygame.font.SysFont(name, size, bold, italic, remember)
+        resolved = RESOLVEDFONTS[key]
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        with open(cachePath + f".{os.getpid()}.tmp", "w") as file:
+            json.dump(RESOLVEDFONTS, file)
+        os.replace(cachePath + f".{os.getpid()}.tmp", cachePath)
+    path, fakeBold, fakeItalic = resolved
+    font = pygame.font.Font(path, size)
+    font.set_bold(fakeBold)
+    font.set_italic(fakeItalic)
+    return font
+
+
+class TextCache:
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.labels = {}  # text -> surface
+        self.fields = {}  # key -> (text, surface)
+
+    def label(self, text):
+        surface = self.labels.get(text)
+        if surface is None:
+            surface = self.labels[text] = self.font.render(text, 1, self.color)
+        return surface
+
+    def field(self, key, text):
+        cached = self.fields.get(key)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        surface = self.font.render(text, 1, self.color)
+        self.fields[key] = (text, surface)
+        return surface
+
+    def clear(self):
+        self.fields.clear()
@@ -0,0 +1,27 @@
+# ----------------------------------TIME WARP----------------------------------
+# Lets the window fast-forward a flight by running more fixed physics steps per
+# rendered frame; only the last step of a frame is drawn. The steps are the same ones
+# a 1x flight takes, so warping never changes the result. Warp falls back to 1x a
+# little before the next staging event, so every event is watched in real time, and
+# whenever the player touches the controls.
+
+WARPS = (1, 10, 100, 1000)
+WARPLEAD = 5.0  # unit: s of flight time, watched at 1x before a staging event
+MAXWARPSTEPS = 1000  # physics steps per frame, so a slow machine just warps slower
+
+
+class TimeWarp:
+    def __init__(self):
+        self.factor = 1
+
+    def change(self, steps, flight):
+        index = WARPS.index(self.factor) + steps
+        self.factor = WARPS[min(max(index, 0), len(WARPS) - 1)]
+        if not self.allowed(flight):
+            self.factor = 1
+
+    def reset(self):
+        self.factor = 1
+
+    def allowed(self, flight):
+        return self.factor == 1 or flight.timeToNextStagingEvent() > WARPLEAD